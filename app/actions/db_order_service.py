@@ -1,22 +1,89 @@
 """Database-based order service wrapper."""
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.actions.order_repository import OrderRepository
 from app.actions.order_service import OrderService
+from app.cache import LRUTTLCache
+from app.config import settings
 from app.models.database import AsyncSessionLocal
-from app.models.domain import ActionType
+from app.models.domain import ActionType, Order
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_order_id(order_id: str) -> str:
+    """Normalize an order ID for cache lookup (" ORD-001 " -> "ORD-001").
+
+    Only surrounding whitespace is stripped: the database lookup is
+    case-sensitive, so folding case here would let the cache answer for IDs
+    the database would not find.
+    """
+    return order_id.strip()
+
+
+class OrderCache(LRUTTLCache[Order]):
+    """LRU cache of found orders keyed on the normalized order ID, with per-entry TTL."""
+    
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 60.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of cached orders
+            ttl_seconds: Seconds before a cached order expires
+        """
+        super().__init__(max_size=max_size, ttl_seconds=ttl_seconds, key=normalize_order_id)
+
+
 class DatabaseOrderService:
     """Wrapper for OrderService that manages database sessions."""
     
+    def __init__(self):
+        """Initialize the service and its order lookup cache."""
+        self.order_cache = OrderCache(
+            max_size=settings.order_cache_size,
+            ttl_seconds=settings.order_cache_ttl_seconds,
+        )
+    
     async def get_order(self, order_id: str):
-        """Get order by ID with proper session management."""
+        """Get order by ID with proper session management (found orders are cached briefly)."""
+        order_id = normalize_order_id(order_id)
+        if settings.order_cache_active:
+            order = self.order_cache.get(order_id)
+            if order is not None:
+                logger.debug(f"Order {order_id} served from order cache")
+                return order
+        
         async with AsyncSessionLocal() as session:
             repository = OrderRepository(session)
-            return await repository.get_order(order_id)
+            order = await repository.get_order(order_id)
+        
+        # Misses aren't cached, so newly created orders are visible right away
+        if order is not None and settings.order_cache_active:
+            self.order_cache.set(order_id, order)
+        return order
+    
+    async def get_orders(self, order_ids: List[str]) -> Dict[str, Order]:
+        """Get several orders by ID, querying only the ones not already cached in one round trip."""
+        orders: Dict[str, Order] = {}
+        missing = []
+        # Cache hits and fetched rows share the normalized ID as their key
+        for order_id in dict.fromkeys(normalize_order_id(order_id) for order_id in order_ids):
+            order = self.order_cache.get(order_id) if settings.order_cache_active else None
+            if order is not None:
+                orders[order_id] = order
+            else:
+                missing.append(order_id)
+        
+        if missing:
+            async with AsyncSessionLocal() as session:
+                repository = OrderRepository(session)
+                fetched = await repository.get_orders(missing)
+            orders.update(fetched)
+            if settings.order_cache_active:
+                for order_id, order in fetched.items():
+                    self.order_cache.set(order_id, order)
+        return orders
     
     async def execute_action(
         self,
@@ -24,10 +91,15 @@ class DatabaseOrderService:
         order_id: Optional[str],
     ) -> Dict[str, Any]:
         """Execute action with proper session management."""
-        async with AsyncSessionLocal() as session:
-            repository = OrderRepository(session)
-            service = OrderService(repository)
-            return await service.execute_action(action, order_id)
+        try:
+            async with AsyncSessionLocal() as session:
+                repository = OrderRepository(session)
+                service = OrderService(repository)
+                return await service.execute_action(action, order_id)
+        finally:
+            # The action may have changed the order's status
+            if order_id:
+                self.order_cache.invalidate(order_id)
 
 
 # Global instance
@@ -3,6 +3,7 @@ import logging
 from typing import Dict, Any, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.domain import Order, OrderStatus
 from app.models.database import OrderDB
 
@@ -30,14 +31,7 @@ class OrderRepository:
             order_db = result.scalar_one_or_none()
             
             if order_db:
-                order = Order(
-                    order_id=order_db.order_id,
-                    status=order_db.status,
-                    expected_delivery_date=order_db.expected_delivery_date,
-                    amount=order_db.amount,
-                    refundable=order_db.refundable,
-                    description=order_db.description,
-                )
+                order = self._db_to_domain(order_db)
                 logger.info(f"ORDER_REPO: Order found - order_id: {order.order_id}, status: {order.status}")
                 return order
             else:
@@ -47,6 +41,24 @@ class OrderRepository:
             logger.error(f"ORDER_REPO: Error fetching order {order_id}: {str(e)}", exc_info=True)
             return None
     
+    async def get_orders(self, order_ids: List[str]) -> Dict[str, Order]:
+        """Get several orders by ID in one query, keyed by order ID (missing IDs are left out)."""
+        logger.info(f"ORDER_REPO: get_orders - order_ids: {order_ids}")
+        if not order_ids:
+            return {}
+        try:
+            stmt = select(OrderDB).where(OrderDB.order_id.in_(order_ids))
+            result = await self.session.execute(stmt)
+            orders = {
+                order_db.order_id: self._db_to_domain(order_db)
+                for order_db in result.scalars().all()
+            }
+            logger.info(f"ORDER_REPO: Found {len(orders)} of {len(order_ids)} orders")
+            return orders
+        except Exception as e:
+            logger.error(f"ORDER_REPO: Error fetching orders {order_ids}: {str(e)}", exc_info=True)
+            return {}
+    
     async def update_order_status(
         self,
         order_id: str,
@@ -66,14 +78,7 @@ class OrderRepository:
             await self.session.commit()
             await self.session.refresh(order_db)
             
-            order = Order(
-                order_id=order_db.order_id,
-                status=order_db.status,
-                expected_delivery_date=order_db.expected_delivery_date,
-                amount=order_db.amount,
-                refundable=order_db.refundable,
-                description=order_db.description,
-            )
+            order = self._db_to_domain(order_db)
             logger.info(f"ORDER_REPO: Order status updated - order_id: {order_id}, status: {new_status}")
             return order
         except Exception as e:
@@ -118,6 +123,37 @@ class OrderRepository:
             logger.error(f"ORDER_REPO: Error creating order: {str(e)}", exc_info=True)
             raise
     
+    async def insert_missing_orders(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Insert order rows in one statement, skipping IDs that already exist.
+        
+        Args:
+            rows: OrderDB column values, one dict per order
+            
+        Returns:
+            IDs of the orders actually inserted
+        """
+        logger.info(f"ORDER_REPO: insert_missing_orders - count: {len(rows)}")
+        if not rows:
+            return []
+        try:
+            stmt = (
+                pg_insert(OrderDB)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[OrderDB.order_id])
+                .returning(OrderDB.order_id)
+            )
+            result = await self.session.execute(stmt)
+            inserted_ids = list(result.scalars().all())
+            await self.session.commit()
+            
+            logger.info(f"ORDER_REPO: Orders inserted - order_ids: {inserted_ids}")
+            return inserted_ids
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"ORDER_REPO: Error inserting orders: {str(e)}", exc_info=True)
+            raise
+    
     async def order_exists(self, order_id: str) -> bool:
         """Check if an order exists."""
         try:
@@ -155,14 +191,7 @@ class OrderRepository:
             orders_db = result.scalars().all()
             
             orders = [
-                Order(
-                    order_id=order_db.order_id,
-                    status=order_db.status,
-                    expected_delivery_date=order_db.expected_delivery_date,
-                    amount=order_db.amount,
-                    refundable=order_db.refundable,
-                    description=order_db.description,
-                )
+                self._db_to_domain(order_db)
                 for order_db in orders_db
             ]
             
@@ -170,4 +199,17 @@ class OrderRepository:
             return orders
         except Exception as e:
             logger.error(f"ORDER_REPO: Error listing orders: {str(e)}", exc_info=True)
-            return []
\ No newline at end of file
+            return []
+    
+    def _db_to_domain(self, order_db: OrderDB) -> Order:
+        """Convert database model to domain model."""
+        # Orders are validated before they are written and the column types match the
+        # model (status is an OrderStatus, the delivery date a date), so skip re-validation
+        return Order.model_construct(
+            order_id=order_db.order_id,
+            status=order_db.status,
+            expected_delivery_date=order_db.expected_delivery_date,
+            amount=order_db.amount,
+            refundable=order_db.refundable,
+            description=order_db.description,
+        )
@@ -1,7 +1,64 @@
 """Shared storage for approval_id to conversation_id mapping."""
-from typing import Dict
+import logging
+from typing import Dict, Optional
+from app.config import settings
 
-# Store approval_id -> conversation_id mapping for graph resumption
-# In production, use Redis or database instead of in-memory dict
-approval_to_conversation: Dict[str, str] = {}
+logger = logging.getLogger(__name__)
 
+
+class AsyncApprovalStore:
+    """
+    Store approval_id -> conversation_id mapping for graph resumption.
+    
+    Backed by Redis when REDIS_URL is set, so any worker/replica can resume a graph
+    whose approval was created by another. Without Redis it falls back to an
+    in-process dict (single-worker deployments only).
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = 86400):
+        """
+        Initialize the store.
+        
+        Args:
+            redis_url: Redis connection URL (None for in-process storage)
+            ttl_seconds: Expiry for Redis keys
+        """
+        self.ttl_seconds = ttl_seconds
+        self._local: Dict[str, str] = {}
+        self._redis = None
+        if redis_url:
+            # Optional dependency, only needed when REDIS_URL is set
+            import redis.asyncio as redis
+            # from_url manages a connection pool; connections are opened on first use
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+            logger.info("Approval mapping store using Redis")
+        else:
+            logger.info("Approval mapping store using in-process dict (set REDIS_URL for multi-worker deployments)")
+    
+    @staticmethod
+    def _key(approval_id: str) -> str:
+        return f"approval:{approval_id}"
+    
+    async def set(self, approval_id: str, conversation_id: str) -> None:
+        """Store the conversation_id for an approval."""
+        if self._redis is not None:
+            await self._redis.set(self._key(approval_id), conversation_id, ex=self.ttl_seconds)
+        else:
+            self._local[approval_id] = conversation_id
+    
+    async def get(self, approval_id: str) -> Optional[str]:
+        """Get the conversation_id for an approval, or None if unknown/expired."""
+        if self._redis is not None:
+            return await self._redis.get(self._key(approval_id))
+        return self._local.get(approval_id)
+    
+    async def aclose(self) -> None:
+        """Close the Redis connection pool, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+approval_store = AsyncApprovalStore(
+    redis_url=settings.redis_url,
+    ttl_seconds=settings.approval_mapping_ttl_seconds,
+)
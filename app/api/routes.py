@@ -2,9 +2,8 @@
 import uuid
 import logging
 from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from langgraph.checkpoint.memory import MemorySaver
 from app.api.schemas import (
     ChatRequest,
     ChatResponse,
@@ -18,22 +17,26 @@ from app.api.schemas import (
     OrderListResponse,
     OrderListItem,
 )
-from app.api.approval_mapping import approval_to_conversation
+from app.api.approval_mapping import approval_store
 from app.models.database import get_db, AsyncSessionLocal
 from app.approvals.service import ApprovalService
 from app.conversations.service import ConversationService
 from app.graph.graph import build_agent_graph
+from app.graph.checkpointer import get_checkpointer
 from app.graph.state import AgentState
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Shared checkpointer for all conversations (in production, use Redis or database)
-# Each conversation is differentiated by thread_id in the config
-_shared_checkpointer = MemorySaver()
+# The shared checkpointer lives in app.graph.checkpointer (created at startup)
 _graph_instance = None  # Single graph instance for all conversations
 
+# Write checkpoints synchronously at the end of each superstep. With the default
+# "async" durability, pending checkpoint writes are chained to one another and
+# keep every prior checkpoint copy alive until the run finishes.
+_GRAPH_DURABILITY = "sync"
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
@@ -66,7 +69,7 @@ async def chat(
         global _graph_instance
         if _graph_instance is None:
             logger.info("Building graph instance (shared across all conversations)...")
-            _graph_instance = build_agent_graph(approval_service, checkpointer=_shared_checkpointer)
+            _graph_instance = build_agent_graph(approval_service, checkpointer=get_checkpointer())
             logger.info("Graph instance created successfully")
         else:
             logger.info("Using existing shared graph instance")
@@ -88,22 +91,19 @@ async def chat(
         try:
             # Try to get the latest checkpoint state for this thread_id
             # Check multiple checkpoints to find the one with the most complete history
-            from langgraph.checkpoint.base import Checkpoint
-            checkpoint_list = list(_shared_checkpointer.list(config, limit=10))
-            if checkpoint_list:
-                # Try each checkpoint (newest first) to find the one with the most complete history
-                for checkpoint_tuple in checkpoint_list:
-                    checkpoint_id = checkpoint_tuple.checkpoint_id if hasattr(checkpoint_tuple, 'checkpoint_id') else None
-                    if checkpoint_id:
-                        checkpoint_data = _shared_checkpointer.get(config, checkpoint_id)
-                        if checkpoint_data and checkpoint_data.get("channel_values"):
-                            previous_state = checkpoint_data["channel_values"]
-                            temp_history = previous_state.get("conversation_history", [])
-                            # Use this checkpoint if it has more messages
-                            if len(temp_history) > len(conversation_history):
-                                conversation_history = temp_history
-                                logger.info(f"Found checkpoint with {len(conversation_history)} messages")
-                logger.info(f"Loaded conversation_history from checkpoint: {len(conversation_history)} messages")
+            # Async API so database-backed checkpointers don't block the event loop
+            checkpointer = get_checkpointer()
+            # Try each checkpoint (newest first) to find the one with the most complete history
+            async for checkpoint_tuple in checkpointer.alist(config, limit=10):
+                checkpoint_data = checkpoint_tuple.checkpoint
+                if checkpoint_data and checkpoint_data.get("channel_values"):
+                    previous_state = checkpoint_data["channel_values"]
+                    temp_history = previous_state.get("conversation_history", [])
+                    # Use this checkpoint if it has more messages
+                    if len(temp_history) > len(conversation_history):
+                        conversation_history = temp_history
+                        logger.info(f"Found checkpoint with {len(conversation_history)} messages")
+            logger.info(f"Loaded conversation_history from checkpoint: {len(conversation_history)} messages")
         except Exception as e:
             logger.warning(f"Could not load previous state from checkpoint: {str(e)}")
             conversation_history = []
@@ -112,10 +112,11 @@ async def chat(
         logger.info("Preparing initial state...")
         initial_state: AgentState = {
             "user_message": request.message,  # New message for this request
-            "conversation_history": conversation_history,  # Loaded from checkpoint
+            "conversation_history": [],  # Appended to the thread's checkpointed history by the state reducer
             "order_data": None,  # Reset for new request
-            "policy_context": None,  # Reset for new request
+            "policy_chunks": None,  # Reset for new request
             "agent_decision": None,  # Reset for new request
+            "decision": None,  # Reset for new request
             "approval_id": None,  # Reset for new request
             "approval_status": None,  # Reset for new request
             "execution_result": None,  # Reset for new request
@@ -139,13 +140,15 @@ async def chat(
             initial_state,
             config=config,
             stream_mode="values",
+            durability=_GRAPH_DURABILITY,
         ):
             event_count += 1
             logger.info(f"Graph event #{event_count} received")
-            logger.debug(f"Event state keys: {list(event.keys()) if event else 'None'}")
-            logger.debug(f"Event next_step: {event.get('next_step') if event else 'None'}")
-            logger.debug(f"Event final_response: {event.get('final_response') if event else 'None'}")
-            logger.debug(f"Event agent_decision: {event.get('agent_decision') if event else 'None'}")
+            if logger.isEnabledFor(logging.DEBUG):  # Skip formatting whole state dicts at INFO
+                logger.debug(f"Event state keys: {list(event.keys()) if event else 'None'}")
+                logger.debug(f"Event next_step: {event.get('next_step') if event else 'None'}")
+                logger.debug(f"Event final_response: {event.get('final_response') if event else 'None'}")
+                logger.debug(f"Event agent_decision: {event.get('agent_decision') if event else 'None'}")
             # Log conversation_history updates
             if event and "conversation_history" in event:
                 hist_len = len(event.get("conversation_history", []))
@@ -325,7 +328,7 @@ async def approve_action(
         logger.info(f"Approval updated successfully")
         
         # Find conversation that has this approval
-        conversation_id = approval_to_conversation.get(approval_id)
+        conversation_id = await approval_store.get(approval_id)
         logger.info(f"Conversation ID for approval: {conversation_id}")
         
         if not conversation_id:
@@ -361,13 +364,15 @@ async def approve_action(
             result = await graph.ainvoke(
                 None,  # None means continue from checkpoint
                 config=config,
+                durability=_GRAPH_DURABILITY,
             )
             logger.info("Graph resumption completed via ainvoke")
-            logger.debug(f"Result state keys: {list(result.keys()) if result else 'None'}")
-            logger.debug(f"Result next_step: {result.get('next_step') if result else 'None'}")
-            logger.debug(f"Result approval_status: {result.get('approval_status') if result else 'None'}")
-            logger.debug(f"Result execution_result: {'present' if result.get('execution_result') else 'None'}")
-            logger.debug(f"Result final_response: {'present' if result.get('final_response') else 'None'}")
+            if logger.isEnabledFor(logging.DEBUG):  # Skip formatting whole state dicts at INFO
+                logger.debug(f"Result state keys: {list(result.keys()) if result else 'None'}")
+                logger.debug(f"Result next_step: {result.get('next_step') if result else 'None'}")
+                logger.debug(f"Result approval_status: {result.get('approval_status') if result else 'None'}")
+                logger.debug(f"Result execution_result: {'present' if result.get('execution_result') else 'None'}")
+                logger.debug(f"Result final_response: {'present' if result.get('final_response') else 'None'}")
         except Exception as e:
             logger.error(f"Error resuming graph: {str(e)}", exc_info=True)
             # If resume fails, still return approval response
@@ -462,44 +467,29 @@ async def get_conversation_history(
         try:
             logger.info(f"[DEBUG] Starting checkpoint retrieval for conversation_id: {conversation_id}")
             logger.info(f"[DEBUG] Config being used: {config}")
-            logger.info(f"[DEBUG] Checkpointer type: {type(_shared_checkpointer)}")
-            logger.info(f"[DEBUG] Checkpointer instance: {_shared_checkpointer}")
+            checkpointer = get_checkpointer()
+            logger.info(f"[DEBUG] Checkpointer type: {type(checkpointer)}")
             
-            from langgraph.checkpoint.base import Checkpoint
             # Try to get multiple checkpoints to find the one with the most complete history
-            # LangGraph's list() returns checkpoints in reverse chronological order (newest first)
-            logger.info(f"[DEBUG] Calling _shared_checkpointer.list(config, limit=10)...")
-            checkpoint_list = list(_shared_checkpointer.list(config, limit=10))
+            # LangGraph's alist() yields checkpoints in reverse chronological order (newest first)
+            logger.info(f"[DEBUG] Calling checkpointer.alist(config, limit=10)...")
+            checkpoint_list = [checkpoint_tuple async for checkpoint_tuple in checkpointer.alist(config, limit=10)]
             logger.info(f"[DEBUG] checkpoint_list length: {len(checkpoint_list)}")
             
-            # Try checkpoints in order (newest first) until we find one with conversation_history
             if checkpoint_list:
-                # Try each checkpoint (newest first) until we find one with conversation_history
+                # Try each checkpoint (newest first), keeping the one with the most messages
                 for idx, checkpoint_tuple in enumerate(checkpoint_list):
                     logger.info(f"[DEBUG] Trying checkpoint {idx+1}/{len(checkpoint_list)}...")
                     
-                    # Use the same method as the chat endpoint for consistency
-                    checkpoint_id = checkpoint_tuple.checkpoint_id if hasattr(checkpoint_tuple, 'checkpoint_id') else None
-                    
-                    if checkpoint_id:
-                        checkpoint_data = _shared_checkpointer.get(config, checkpoint_id)
-                        if checkpoint_data and checkpoint_data.get("channel_values"):
-                            previous_state = checkpoint_data["channel_values"]
-                            temp_history = previous_state.get("conversation_history", [])
-                            
-                            # Use this checkpoint if it has more messages than what we've found so far
-                            if len(temp_history) > len(conversation_history):
-                                conversation_history = temp_history
-                                logger.info(f"[DEBUG] Found checkpoint with {len(conversation_history)} messages (checkpoint {idx+1})")
-                    else:
-                        # Fallback to direct checkpoint access if checkpoint_id is not available
-                        checkpoint_data = checkpoint_tuple.checkpoint if hasattr(checkpoint_tuple, 'checkpoint') else None
-                        if checkpoint_data and isinstance(checkpoint_data, dict) and checkpoint_data.get("channel_values"):
-                            previous_state = checkpoint_data["channel_values"]
-                            temp_history = previous_state.get("conversation_history", [])
-                            if len(temp_history) > len(conversation_history):
-                                conversation_history = temp_history
-                                logger.info(f"[DEBUG] Found checkpoint with {len(conversation_history)} messages (fallback method, checkpoint {idx+1})")
+                    checkpoint_data = checkpoint_tuple.checkpoint
+                    if checkpoint_data and checkpoint_data.get("channel_values"):
+                        previous_state = checkpoint_data["channel_values"]
+                        temp_history = previous_state.get("conversation_history", [])
+                        
+                        # Use this checkpoint if it has more messages than what we've found so far
+                        if len(temp_history) > len(conversation_history):
+                            conversation_history = temp_history
+                            logger.info(f"[DEBUG] Found checkpoint with {len(conversation_history)} messages (checkpoint {idx+1})")
                 
                 logger.info(f"Loaded conversation_history from checkpoint: {len(conversation_history)} messages")
                 if conversation_history:
@@ -545,7 +535,7 @@ async def list_conversations(
     db: AsyncSession = Depends(get_db),
     limit: int = 100,
     offset: int = 0,
-) -> ConversationListResponse:
+) -> Response:
     """
     Get list of all conversations.
     
@@ -581,7 +571,12 @@ async def list_conversations(
         logger.info(f"Returning {len(conversation_items)} conversations")
         logger.info("=" * 80)
         
-        return ConversationListResponse(conversations=conversation_items)
+        # Items are already validated: serialize straight to JSON in pydantic-core instead of
+        # letting FastAPI re-validate against response_model (kept for the OpenAPI schema)
+        return Response(
+            content=ConversationListResponse(conversations=conversation_items).model_dump_json(),
+            media_type="application/json",
+        )
         
     except Exception as e:
         logger.error("=" * 80)
@@ -621,6 +616,13 @@ async def delete_conversation(
             logger.warning(f"Conversation {conversation_id} not found")
             raise HTTPException(status_code=404, detail="Conversation not found")
         
+        # Also drop the conversation's checkpoints so they don't accumulate
+        # (the conversation itself is already gone, so a failure here isn't fatal)
+        try:
+            await get_checkpointer().adelete_thread(conversation_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete checkpoints for conversation {conversation_id}: {e}")
+        
         logger.info(f"Conversation {conversation_id} deleted successfully")
         logger.info("=" * 80)
         
@@ -715,7 +717,7 @@ async def list_orders(
     db: AsyncSession = Depends(get_db),
     limit: int = 100,
     offset: int = 0,
-) -> OrderListResponse:
+) -> Response:
     """
     Get list of all orders.
     
@@ -769,7 +771,11 @@ async def list_orders(
         logger.info(f"Returning {len(order_items)} orders (total: {total})")
         logger.info("=" * 80)
         
-        return OrderListResponse(orders=order_items, total=total)
+        # Serialized directly, as in list_conversations
+        return Response(
+            content=OrderListResponse(orders=order_items, total=total).model_dump_json(),
+            media_type="application/json",
+        )
         
     except Exception as e:
         logger.error("=" * 80)
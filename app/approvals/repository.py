@@ -128,7 +128,8 @@ class ApprovalRepository:
     
     def _db_to_domain(self, approval_db: ApprovalDB) -> Approval:
         """Convert database model to domain model."""
-        return Approval(
+        # Columns already have the model's types (status is an ApprovalStatus), so skip validation
+        return Approval.model_construct(
             approval_id=approval_db.approval_id,
             order_id=approval_db.order_id,
             action=approval_db.action,
@@ -0,0 +1,58 @@
+"""In-process LRU + TTL cache shared by the policy query and order lookup caches."""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUTTLCache(Generic[V]):
+    """LRU cache with per-entry TTL; lookups are stored under key(lookup)."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        key: Callable[[Any], Hashable] = lambda lookup: lookup,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached entries
+            ttl_seconds: Seconds before a cached entry expires
+            key: Maps a lookup to the key it is stored under (identity by default)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._key = key
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, lookup: Any) -> Optional[V]:
+        """Get a cached value, or None on a miss or expired entry."""
+        key = self._key(lookup)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, lookup: Any, value: V) -> None:
+        """Cache a value, evicting the least recently used entry when full."""
+        key = self._key(lookup)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, lookup: Any) -> None:
+        """Drop one cached entry."""
+        self._entries.pop(self._key(lookup), None)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
@@ -1,6 +1,6 @@
 """Configuration management using Pydantic Settings."""
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 import ssl
 
@@ -18,16 +18,59 @@ class Settings(BaseSettings):
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     database_url: Optional[str] = None
+    # SQLAlchemy connection pool: 0 disables pooling (NullPool), for PgBouncer/Supabase pooler
+    # URLs that pool server-side. Set > 0 when connecting to PostgreSQL directly.
+    db_pool_size: int = 0
+    db_max_overflow: int = 30
+    db_pool_recycle_seconds: int = 1800
+    
+    # LangGraph Checkpointer Configuration
+    # "memory" (in-process, lost on restart) or "postgres" (persistent, shared between workers)
+    checkpointer_backend: str = "memory"
+    checkpointer_pool_max_size: int = 10
+    # Compress serialized checkpoint values at least this many bytes long (0 disables)
+    checkpoint_compression_threshold: int = 1024
     
     # LangSmith Configuration
     langchain_tracing_v2: bool = True
     langchain_api_key: Optional[str] = None
     langchain_project: str = "ecommerce-support-agent"
+    # Fraction of traces sent to LangSmith (0.0-1.0); None traces every request
+    langchain_tracing_sampling_rate: Optional[float] = None
+    
+    # Redis Configuration (approval -> conversation mapping shared across workers)
+    redis_url: Optional[str] = None
+    approval_mapping_ttl_seconds: int = 86400
+    
+    # LLM Rate Limiting Configuration
+    llm_max_concurrency: int = 16  # Concurrent LLM decision calls (about half the provider's RPM budget)
+    llm_max_retries: int = 4  # SDK retries with exponential backoff and jitter on 429/5xx
+    
+    # LLM Model Configuration
+    llm_model: str = "gpt-4"
+    # Server-enforced JSON schema for agent decisions; needs a model with structured outputs (e.g. gpt-4o)
+    llm_strict_schema: bool = False
+    
+    # Policy Retrieval Cache Configuration
+    policy_query_cache_enabled: bool = True
+    policy_query_cache_size: int = 1024
+    policy_query_cache_ttl_seconds: float = 600.0
+    # Extra wait for concurrent policy queries to join one embedding batch (0 sends at once)
+    policy_query_batch_window_ms: float = 0.0
+    
+    # Order Lookup Cache Configuration
+    # None: on for a single worker, off when checkpointer_backend/redis_url indicate several
+    # workers (an action only invalidates the cache of the worker that ran it)
+    order_cache_enabled: Optional[bool] = None
+    order_cache_size: int = 512
+    order_cache_ttl_seconds: float = 60.0
     
     # Application Configuration
     app_name: str = "ECommerce Support Agent"
     app_version: str = "1.0.0"
     log_level: str = "INFO"
+    # Loggers raised to DEBUG at startup; set DEBUG_LOGGERS='[]' to keep them at log_level
+    debug_loggers: List[str] = ["app", "app.api", "app.graph", "app.llm", "app.rag", "app.actions"]
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -64,6 +107,22 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
     
+    @property
+    def get_checkpointer_database_url(self) -> str:
+        """Get a plain libpq URL for the psycopg-based checkpointer.
+        
+        Drops the SQLAlchemy driver suffix but keeps sslmode, which psycopg supports.
+        """
+        url = self.database_url or self.get_database_url
+        return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    
+    @property
+    def order_cache_active(self) -> bool:
+        """Whether order lookups are cached (ORDER_CACHE_ENABLED, else off for multi-worker deployments)."""
+        if self.order_cache_enabled is not None:
+            return self.order_cache_enabled
+        return self.checkpointer_backend.lower() != "postgres" and not self.redis_url
+    
     def get_ssl_config(self) -> dict:
         """Get SSL configuration and connection args for asyncpg based on database_url.
         
@@ -198,7 +198,8 @@ class ConversationRepository:
     
     def _db_to_domain(self, conversation_db: ConversationDB) -> Conversation:
         """Convert database model to domain model."""
-        return Conversation(
+        # Plain string/datetime columns written by this repository: no validation needed
+        return Conversation.model_construct(
             conversation_id=conversation_db.conversation_id,
             title=conversation_db.title,
             last_message=conversation_db.last_message,
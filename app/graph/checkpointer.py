@@ -0,0 +1,117 @@
+"""Checkpointer setup for the agent graph."""
+import logging
+import zlib
+from typing import Any, Optional, Tuple
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_ZLIB_SUFFIX = "+zlib"
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Serializer wrapper that zlib-compresses payloads above a size threshold."""
+
+    def __init__(self, serde: SerializerProtocol, threshold: int, level: int = 1):
+        self.serde = serde
+        self.threshold = threshold
+        self.level = level  # Fastest level: checkpoint state is mostly JSON text and compresses well anyway
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        typ, data = self.serde.dumps_typed(obj)
+        if len(data) < self.threshold:
+            return typ, data
+        # Mark compressed payloads in the type so small/old uncompressed ones still load
+        return f"{typ}{_ZLIB_SUFFIX}", zlib.compress(data, self.level)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        typ, payload = data
+        if typ.endswith(_ZLIB_SUFFIX):
+            return self.serde.loads_typed((typ[:-len(_ZLIB_SUFFIX)], zlib.decompress(payload)))
+        return self.serde.loads_typed(data)
+
+
+def _make_serde() -> Optional[SerializerProtocol]:
+    """Checkpoint serializer, compressing large channel values unless disabled (threshold 0)."""
+    threshold = settings.checkpoint_compression_threshold
+    if threshold <= 0:
+        return None  # Saver default
+    return CompressedSerializer(JsonPlusSerializer(), threshold=threshold)
+
+
+# Shared checkpointer for all conversations, created once at startup
+# Each conversation is differentiated by thread_id in the config
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_pool = None  # Postgres connection pool, only set for the postgres backend
+
+
+def is_persistent_checkpointer() -> bool:
+    """Whether checkpoints survive an application restart."""
+    return settings.checkpointer_backend.lower() == "postgres"
+
+
+async def init_checkpointer() -> BaseCheckpointSaver:
+    """
+    Create the shared checkpointer for the configured backend.
+
+    "memory" keeps checkpoints in process (lost on restart, not shared between workers).
+    "postgres" stores them in PostgreSQL through a pooled AsyncPostgresSaver and creates
+    the checkpoint tables on first use.
+
+    Returns:
+        Checkpointer instance
+    """
+    global _checkpointer, _pool
+    if _checkpointer is not None:
+        return _checkpointer
+
+    backend = settings.checkpointer_backend.lower()
+    if backend == "postgres":
+        # Optional dependencies, only needed for the postgres backend
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        logger.info(f"Creating AsyncPostgresSaver checkpointer (pool max_size={settings.checkpointer_pool_max_size})")
+        _pool = AsyncConnectionPool(
+            conninfo=settings.get_checkpointer_database_url,
+            max_size=settings.checkpointer_pool_max_size,
+            # prepare_threshold=0: PgBouncer (Supabase pooler) doesn't support prepared statements
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=False,
+        )
+        await _pool.open()
+        checkpointer = AsyncPostgresSaver(_pool, serde=_make_serde())
+        await checkpointer.setup()  # Creates checkpoint tables if missing
+        logger.info("AsyncPostgresSaver checkpointer ready")
+    elif backend == "memory":
+        checkpointer = MemorySaver(serde=_make_serde())
+        logger.info("Created MemorySaver checkpointer")
+    else:
+        raise ValueError(f"Unknown checkpointer backend: {settings.checkpointer_backend}")
+
+    _checkpointer = checkpointer
+    return _checkpointer
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Get the shared checkpointer (falls back to an in-memory one if startup didn't create it)."""
+    global _checkpointer
+    if _checkpointer is None:
+        logger.warning("Checkpointer not initialized at startup, using MemorySaver")
+        _checkpointer = MemorySaver(serde=_make_serde())
+    return _checkpointer
+
+
+async def close_checkpointer() -> None:
+    """Close the checkpointer's connection pool, if any."""
+    global _checkpointer, _pool
+    if _pool is not None:
+        await _pool.close()
+        logger.info("Checkpointer connection pool closed")
+    _pool = None
+    _checkpointer = None
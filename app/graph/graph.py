@@ -1,6 +1,7 @@
 """LangGraph agent graph construction."""
 import logging
-from typing import Literal
+from functools import partial
+from typing import List, Literal
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langsmith import traceable
@@ -15,86 +16,88 @@ from app.graph.nodes import (
     check_approval_status,
     execute_write_action,
     format_final_response,
+    POLICY_INTENTS,
 )
-from app.models.domain import NextStep, ActionType, ApprovalStatus
+from app.models.domain import NextStep, ActionType, ApprovalStatus, Intent
 
 logger = logging.getLogger(__name__)
 
+# Maximum iteration_count at which the agent may still loop back for more data
+MAX_ITERATIONS = 5
 
-def should_fetch_order(state: AgentState) -> Literal["fetch_order_data", "retrieve_policy", "llm_reasoning"]:
-    """Conditional routing: should we fetch order data?"""
-    next_step = state.get("next_step", NextStep.NONE.value)
-    logger.debug(f"ROUTING: should_fetch_order - next_step: {next_step}")
-    
-    if next_step == NextStep.FETCH_ORDER.value:
-        logger.info("ROUTING: -> fetch_order_data")
-        return "fetch_order_data"
-    elif next_step == NextStep.FETCH_POLICY.value:
-        logger.info("ROUTING: -> retrieve_policy")
-        return "retrieve_policy"
-    
-    logger.info("ROUTING: -> llm_reasoning")
-    return "llm_reasoning"
+# Conditional-edge maps (router return value -> node name), shared across graph builds.
+# Kept as plain dicts: add_conditional_edges only accepts a dict or list path map.
+_AFTER_CLASSIFY_EDGES = {
+    "fetch_order_data": "fetch_order_data",
+    "retrieve_policy": "retrieve_policy",
+}
+# next_step values that loop back for more data -> node that fetches it (enum values resolved once)
+_LOOP_BACK_NODES = {
+    NextStep.FETCH_ORDER.value: "fetch_order_data",
+    NextStep.FETCH_POLICY.value: "retrieve_policy",
+}
+_NO_NEXT_STEP = NextStep.NONE.value
 
+_AFTER_GUARDRAILS_EDGES = {
+    "fetch_order_data": "fetch_order_data",  # Loop back to fetch order data
+    "retrieve_policy": "retrieve_policy",  # Loop back to retrieve policy
+    "human_approval": "human_approval",
+    "execute_write_action": "execute_write_action",
+    "format_final_response": "format_final_response",
+}
 
-def should_fetch_policy(state: AgentState) -> Literal["retrieve_policy", "llm_reasoning"]:
-    """Conditional routing: should we fetch policy?"""
-    next_step = state.get("next_step", NextStep.NONE.value)
-    logger.debug(f"ROUTING: should_fetch_policy - next_step: {next_step}")
-    
-    if next_step == NextStep.FETCH_POLICY.value:
-        logger.info("ROUTING: -> retrieve_policy")
-        return "retrieve_policy"
-    
-    logger.info("ROUTING: -> llm_reasoning")
-    return "llm_reasoning"
+
+def route_after_classify(state: AgentState) -> List[Literal["fetch_order_data", "retrieve_policy"]]:
+    """Conditional routing: fetch order data, plus policies in parallel when the intent needs them."""
+    intent = state.get("intent", Intent.GENERAL.value)
+    if intent in POLICY_INTENTS:
+        logger.info(f"ROUTING: -> fetch_order_data + retrieve_policy (parallel, intent: {intent})")
+        return ["fetch_order_data", "retrieve_policy"]
+    
+    # Order status lookups, greetings, etc. don't need policy context (fast path);
+    # the LLM can still ask for it via next_step=FETCH_POLICY
+    logger.info(f"ROUTING: -> fetch_order_data (intent: {intent})")
+    return ["fetch_order_data"]
 
 
 def should_require_approval(state: AgentState) -> Literal["human_approval", "execute_write_action", "format_final_response", "fetch_order_data", "retrieve_policy"]:
     """Conditional routing: does this require human approval or more data?"""
-    agent_decision = state.get("agent_decision")
-    logger.debug(f"ROUTING: should_require_approval - agent_decision: {'present' if agent_decision else 'None'}")
-    
-    # First check if we need more data (check next_step before routing to final response)
-    next_step = state.get("next_step", NextStep.NONE.value)
+    # Read everything the router needs from state once up front
+    decision = state.get("decision")
+    next_step = state.get("next_step", _NO_NEXT_STEP)
+    iteration_count = state.get("iteration_count", 0)
+    approval_status = state.get("approval_status")
+    logger.debug(f"ROUTING: should_require_approval - decision: {'present' if decision else 'None'}")
     logger.debug(f"ROUTING: should_require_approval - next_step: {next_step}")
     
+    # First check if we need more data (check next_step before routing to final response)
     # If next_step indicates we need more data, route back to fetch nodes
-    if next_step == NextStep.FETCH_ORDER.value:
-        iteration_count = state.get("iteration_count", 0)
-        if iteration_count <= 5:  # Prevent infinite loops
-            logger.info("ROUTING: -> fetch_order_data (next_step indicates need for order data)")
-            return "fetch_order_data"
+    loop_back_node = _LOOP_BACK_NODES.get(next_step)
+    if loop_back_node:
+        if iteration_count > MAX_ITERATIONS:  # Prevent infinite loops
+            # Stop looping; the decision below still goes through approval if it proposes an action
+            logger.warning(f"ROUTING: Max iterations reached ({iteration_count}), not looping back for more data")
         else:
-            logger.warning(f"ROUTING: Max iterations reached ({iteration_count}), going to final response")
+            logger.info(f"ROUTING: -> {loop_back_node} (next_step {next_step} indicates need for more data)")
+            return loop_back_node
     
-    if next_step == NextStep.FETCH_POLICY.value:
-        iteration_count = state.get("iteration_count", 0)
-        if iteration_count <= 5:  # Prevent infinite loops
-            logger.info("ROUTING: -> retrieve_policy (next_step indicates need for policy data)")
-            return "retrieve_policy"
-        else:
-            logger.warning(f"ROUTING: Max iterations reached ({iteration_count}), going to final response")
-    
-    if not agent_decision:
-        logger.info("ROUTING: -> format_final_response (no agent_decision)")
+    if not decision:
+        logger.info("ROUTING: -> format_final_response (no decision)")
         return "format_final_response"
     
-    action = agent_decision.get("action", ActionType.NONE.value)
-    logger.debug(f"ROUTING: should_require_approval - action: {action}")
+    logger.debug(f"ROUTING: should_require_approval - action: {decision.action}")
     
     # If action is not NONE, require approval
-    if action != ActionType.NONE.value:
-        approval_status = state.get("approval_status")
+    if decision.action is not ActionType.NONE:
         logger.debug(f"ROUTING: should_require_approval - approval_status: {approval_status}")
         
         # If already approved, execute
-        if approval_status == ApprovalStatus.APPROVED:
+        if approval_status is ApprovalStatus.APPROVED:
             logger.info("ROUTING: -> execute_write_action (already approved)")
             return "execute_write_action"
         
         # If rejected, skip to final response
-        if approval_status == ApprovalStatus.REJECTED:
+        if approval_status is ApprovalStatus.REJECTED:
             logger.info("ROUTING: -> format_final_response (rejected)")
             return "format_final_response"
         
@@ -106,31 +109,6 @@ def should_require_approval(state: AgentState) -> Literal["human_approval", "exe
     return "format_final_response"
 
 
-def should_loop(state: AgentState) -> Literal["fetch_order_data", "retrieve_policy", "llm_reasoning", "format_final_response"]:
-    """Conditional routing: should we loop for more information?"""
-    iteration_count = state.get("iteration_count", 0)
-    next_step = state.get("next_step", NextStep.NONE.value)
-    logger.debug(f"ROUTING: should_loop - iteration_count: {iteration_count}, next_step: {next_step}")
-    
-    # Max iterations to prevent infinite loops
-    if iteration_count > 5:
-        logger.warning(f"ROUTING: -> format_final_response (max iterations reached: {iteration_count})")
-        return "format_final_response"
-    
-    if next_step == NextStep.FETCH_ORDER.value:
-        logger.info("ROUTING: -> fetch_order_data")
-        return "fetch_order_data"
-    elif next_step == NextStep.FETCH_POLICY.value:
-        logger.info("ROUTING: -> retrieve_policy")
-        return "retrieve_policy"
-    elif next_step == NextStep.NONE.value:
-        logger.info("ROUTING: -> format_final_response (next_step is NONE)")
-        return "format_final_response"
-    
-    logger.info("ROUTING: -> llm_reasoning")
-    return "llm_reasoning"
-
-
 @traceable(name="build_agent_graph")
 def build_agent_graph(approval_service, checkpointer=None):
     """
@@ -154,18 +132,16 @@ def build_agent_graph(approval_service, checkpointer=None):
     workflow.add_node("llm_reasoning", llm_reasoning)
     workflow.add_node("output_guardrails", output_guardrails)
     
+    # Approval nodes need the approval service; bind it instead of wrapping in closures
     # Human approval node - creates approval request
-    async def human_approval_node(state: AgentState):
-        """Human approval node wrapper - creates approval if needed."""
-        return await human_approval(state, approval_service)
-    
+    workflow.add_node("human_approval", partial(human_approval, approval_service=approval_service))
     # Check approval status node - validates status and interrupts if PENDING
-    async def check_approval_status_node(state: AgentState):
-        """Check approval status node wrapper - validates and interrupts if needed."""
-        return await check_approval_status(state, approval_service)
-    
-    workflow.add_node("human_approval", human_approval_node)
-    workflow.add_node("check_approval_status", check_approval_status_node)
+    # (destinations given explicitly since they can't be read from a partial's annotations)
+    workflow.add_node(
+        "check_approval_status",
+        partial(check_approval_status, approval_service=approval_service),
+        destinations=("execute_write_action", "format_final_response"),
+    )
     workflow.add_node("execute_write_action", execute_write_action)
     workflow.add_node("format_final_response", format_final_response)
     
@@ -173,19 +149,16 @@ def build_agent_graph(approval_service, checkpointer=None):
     workflow.set_entry_point("classify_intent")
     
     # Add edges
-    workflow.add_edge("classify_intent", "fetch_order_data")
-    
-    # Conditional routing after fetch_order_data
+    # Fan out: order lookup and policy retrieval run in the same superstep
     workflow.add_conditional_edges(
-        "fetch_order_data",
-        should_fetch_policy,
-        {
-            "retrieve_policy": "retrieve_policy",
-            "llm_reasoning": "llm_reasoning",
-        }
+        "classify_intent",
+        route_after_classify,
+        _AFTER_CLASSIFY_EDGES,
     )
     
-    # After retrieve_policy, go to llm_reasoning
+    # Fan in: llm_reasoning runs once, after whichever fetch nodes ran
+    # (also the path for loop-backs, which re-run a single fetch node)
+    workflow.add_edge("fetch_order_data", "llm_reasoning")
     workflow.add_edge("retrieve_policy", "llm_reasoning")
     
     # After llm_reasoning, validate with guardrails
@@ -196,39 +169,17 @@ def build_agent_graph(approval_service, checkpointer=None):
     workflow.add_conditional_edges(
         "output_guardrails",
         should_require_approval,
-        {
-            "fetch_order_data": "fetch_order_data",  # Loop back to fetch order data
-            "retrieve_policy": "retrieve_policy",  # Loop back to retrieve policy
-            "human_approval": "human_approval",
-            "execute_write_action": "execute_write_action",
-            "format_final_response": "format_final_response",
-        }
+        _AFTER_GUARDRAILS_EDGES,
     )
     
     # After human_approval, always go to check_approval_status
+    # These stay two nodes paused with interrupt_before rather than one node calling interrupt():
+    # a node that interrupts mid-run has none of its writes checkpointed and is re-run from the
+    # top on resume, so approval_id and the history update would be missing from the /chat
+    # result and the history endpoint, and the approval would be created a second time.
     workflow.add_edge("human_approval", "check_approval_status")
     
-    # After check_approval_status, route based on approval status
-    def route_after_approval_check(state: AgentState) -> Literal["execute_write_action", "format_final_response"]:
-        """Route after checking approval status."""
-        approval_status = state.get("approval_status")
-        logger.debug(f"ROUTING: route_after_approval_check - approval_status: {approval_status}")
-        
-        if approval_status == ApprovalStatus.APPROVED:
-            logger.info("ROUTING: -> execute_write_action (approved)")
-            return "execute_write_action"
-        else:  # REJECTED
-            logger.info("ROUTING: -> format_final_response (rejected)")
-            return "format_final_response"
-    
-    workflow.add_conditional_edges(
-        "check_approval_status",
-        route_after_approval_check,
-        {
-            "execute_write_action": "execute_write_action",
-            "format_final_response": "format_final_response",
-        }
-    )
+    # check_approval_status routes itself (Command goto) based on approval status
     
     # After execution, go to final response
     workflow.add_edge("execute_write_action", "format_final_response")
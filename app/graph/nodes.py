@@ -1,14 +1,23 @@
 """LangGraph node implementations."""
+import asyncio
+import contextvars
+import hashlib
 import logging
 import re
-from typing import Dict, Any
+from datetime import date
+from typing import Dict, Any, Literal, Optional
+import orjson
+from langgraph.types import Command
 from langsmith import traceable
-from app.graph.state import AgentState
-from app.llm.client import LLMClient, normalize_llm_response_dict
+from app.graph.state import AgentState, Decision
+from app.llm.client import LLMClient
 from app.rag.chroma_client import ChromaClient
+from app.rag.query_cache import PolicyQueryCache
 from app.guardrails.validator import GuardrailsValidator
 from app.actions.db_order_service import db_order_service
-from app.models.domain import NextStep, ActionType
+from app.models.domain import NextStep, ActionType, ApprovalStatus, Intent, LLMResponse
+from app.api.approval_mapping import approval_store
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +25,107 @@ logger = logging.getLogger(__name__)
 llm_client = LLMClient()
 chroma_client = ChromaClient()
 guardrails_validator = GuardrailsValidator()
+policy_query_cache = PolicyQueryCache(
+    max_size=settings.policy_query_cache_size,
+    ttl_seconds=settings.policy_query_cache_ttl_seconds,
+)
+
+# Maximum characters of each policy chunk passed to the LLM
+# (current policy documents are under 1,100 characters, so none are cut today)
+MAX_POLICY_CHARS = 1500
+
+# Order ID extraction patterns, compiled once
+_ORDER_WORD_RE = re.compile(r'(?<!\S)(?:ORD-|#)\S*')
+_ORDER_ID_PUNCTUATION_RE = re.compile(r'[#?.,!;:]')
+_NUMERIC_ORDER_ID_RE = re.compile(r'(?:order|#)\s*(\d+)', re.IGNORECASE)
+
+# Seeded demo orders, tried as fuzzy matches for "ORD-" IDs that don't match exactly
+_AVAILABLE_ORDER_IDS = ('ORD-001', 'ORD-002', 'ORD-003', 'ORD-004', 'ORD-005')
+
+# Keyword patterns for intent classification, checked in order (first match wins)
+_INTENT_PATTERNS = [
+    (Intent.REFUND, re.compile(r'\b(?:refunds?|refunded|money back|reimburse\w*|returns?|returning)\b', re.IGNORECASE)),
+    (Intent.CANCELLATION, re.compile(r'\b(?:cancel\w*)\b', re.IGNORECASE)),
+    (Intent.DELAYED_ORDER, re.compile(r'\b(?:delay\w*|late|overdue|hasn\'?t arrived|not arrived|still waiting)\b', re.IGNORECASE)),
+    (Intent.POLICY_QUESTION, re.compile(r'\b(?:polic(?:y|ies)|eligib\w*|allowed|rules?|terms|compensation)\b', re.IGNORECASE)),
+]
+
+# Intents whose answers depend on policy documents, so retrieve_policy runs for them
+POLICY_INTENTS = frozenset({Intent.REFUND, Intent.CANCELLATION, Intent.DELAYED_ORDER, Intent.POLICY_QUESTION})
+
+# In-flight LLM decision calls, keyed on their inputs, so concurrent identical requests share one call
+_inflight_decisions: Dict[str, asyncio.Task] = {}
+
+# Caps concurrent LLM decision calls so bursts stay under the provider's rate limit
+_llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+
+# Enum values compared against plain strings in state, resolved once
+_NO_NEXT_STEP = NextStep.NONE.value
+_NO_ACTION = ActionType.NONE.value
+
+# Read-only decisions at or above this confidence skip the guardrails validator
+GUARDRAILS_FAST_PATH_CONFIDENCE = 0.9
+
+# Decision used when llm_reasoning left none in state; dumped once here instead of per request
+_FALLBACK_DECISION = LLMResponse(
+    analysis="No decision available",
+    final_answer="I apologize, but I couldn't process your request.",
+    action=ActionType.NONE,
+    order_id=None,
+    confidence=0.0,
+    requires_human_approval=False,
+)
+_FALLBACK_DECISION_JSON = _FALLBACK_DECISION.model_dump(mode="json")
+
+
+async def _get_agent_decision_bounded(decision_inputs: Dict[str, Any]):
+    """Call llm_client.get_agent_decision once a concurrency slot is free."""
+    async with _llm_semaphore:
+        return await llm_client.get_agent_decision(**decision_inputs)
+
+
+async def _get_agent_decision_coalesced(**decision_inputs: Any):
+    """
+    Call llm_client.get_agent_decision, sharing one in-flight call between concurrent identical requests.
+    
+    Nothing is cached: the key is dropped as soon as the call finishes, so every
+    later request gets a fresh decision.
+    
+    Args:
+        **decision_inputs: Keyword arguments for llm_client.get_agent_decision
+        
+    Returns:
+        Tuple of (LLMResponse, next_step)
+    """
+    key = hashlib.sha256(
+        orjson.dumps(decision_inputs, default=str, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    task = _inflight_decisions.get(key)
+    if task is None:
+        # Empty context: the call is shared by every coalesced request, so its LLM spans
+        # must not be nested under (and ended with) the first request's trace
+        task = asyncio.get_running_loop().create_task(
+            _get_agent_decision_bounded(decision_inputs), context=contextvars.Context()
+        )
+        _inflight_decisions[key] = task
+        task.add_done_callback(lambda _: _inflight_decisions.pop(key, None))
+    else:
+        logger.info("Identical LLM decision already in flight, awaiting its result")
+    # Shield so a cancelled request doesn't cancel the call for the others waiting on it
+    return await asyncio.shield(task)
+
+
+def _log_node(node: str, phase: str, **fields: Any) -> None:
+    """Log a node's START/END as one record; the state fields are only added at DEBUG level."""
+    if fields and logger.isEnabledFor(logging.DEBUG):
+        logger.info(">>> NODE: %s - %s %s", node, phase, fields)
+    else:
+        logger.info(">>> NODE: %s - %s", node, phase)
+
+
+def _state_delta(state: AgentState, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop updates whose value is already in state, so unchanged channels aren't checkpointed again."""
+    return {key: value for key, value in updates.items() if state.get(key) != value}
 
 
 def _update_conversation_history(state: AgentState) -> Dict[str, Any]:
@@ -29,7 +139,8 @@ def _update_conversation_history(state: AgentState) -> Dict[str, Any]:
         state: Current agent state
         
     Returns:
-        Dictionary with updated conversation_history, or empty dict if no update needed
+        Dictionary with the two new conversation_history messages (appended by the state
+        reducer), or empty dict if no update needed
     """
     conversation_history = state.get("conversation_history", [])
     user_message = state.get("user_message", "")
@@ -53,25 +164,60 @@ def _update_conversation_history(state: AgentState) -> Dict[str, Any]:
                 logger.debug("User message already in history, skipping update")
                 return {}
     
-    # Update conversation_history
-    updated_history = conversation_history.copy()
-    updated_history.append({
-        "role": "user",
-        "content": user_message
-    })
-    updated_history.append({
-        "role": "assistant",
-        "content": response
-    })
-    
-    logger.info(f"Updated conversation_history: {len(updated_history)} messages (added 2 new messages)")
+    # Return only the new exchange; the conversation_history reducer appends it
+    new_messages = [
+        {
+            "role": "user",
+            "content": user_message
+        },
+        {
+            "role": "assistant",
+            "content": response
+        },
+    ]
+    
+    logger.info(f"Updated conversation_history: {len(conversation_history) + len(new_messages)} messages (added 2 new messages)")
     return {
-        "conversation_history": updated_history,
+        "conversation_history": new_messages,
     }
 
 
+def extract_order_id(user_message: str) -> Optional[str]:
+    """
+    Extract an order ID from a user message (improved extraction with punctuation removal).
+    
+    Args:
+        user_message: User's message
+        
+    Returns:
+        Order ID like "ORD-001", or None if the message doesn't reference an order
+    """
+    # Try to find order ID in various formats (first word starting with "ORD-" or "#")
+    word_match = _ORDER_WORD_RE.search(user_message)
+    if word_match:
+        # Remove # and all punctuation, keep alphanumeric and hyphens
+        order_id = _ORDER_ID_PUNCTUATION_RE.sub('', word_match.group(0))
+        logger.info(f"Found order ID (raw): {order_id}")
+        if order_id:
+            return order_id
+    
+    # If no order ID found, try to extract numeric ID from message
+    # Look for patterns like "order #12345" or "order 12345"
+    numeric_match = _NUMERIC_ORDER_ID_RE.search(user_message)
+    if numeric_match:
+        numeric_id = numeric_match.group(1)
+        logger.info(f"Found numeric order ID: {numeric_id}")
+        # Try to map to ORD- format (e.g., "12345" -> "ORD-12345" or find closest match)
+        # First try direct format conversion
+        order_id = f"ORD-{numeric_id.zfill(3)}"  # Pad to 3 digits: "12345" -> "ORD-12345"
+        logger.info(f"Trying formatted order ID: {order_id}")
+        return order_id
+    
+    return None
+
+
 @traceable(name="classify_intent")
-def classify_intent(state: AgentState) -> Dict[str, Any]:
+async def classify_intent(state: AgentState) -> Dict[str, Any]:
     """
     Classify user intent and initialize state.
     
@@ -81,21 +227,24 @@ def classify_intent(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state
     """
-    logger.info(">>> NODE: classify_intent - START")
-    logger.info(f"Input state - user_message: {state.get('user_message')}")
-    logger.info(f"Input state - iteration_count: {state.get('iteration_count', 0)}")
+    _log_node("classify_intent", "START", user_message=state.get('user_message'), iteration_count=state.get('iteration_count', 0))
     
     iteration_count = state.get("iteration_count", 0) + 1
-    next_step = NextStep.FETCH_ORDER.value
     
-    result = {
+    # Cheap keyword classification; decides whether policy retrieval is needed
+    user_message = state.get("user_message", "")
+    intent = next(
+        (intent for intent, pattern in _INTENT_PATTERNS if pattern.search(user_message)),
+        Intent.GENERAL,
+    )
+    
+    # next_step is left alone: the first pass always fetches, and llm_reasoning sets it
+    result = _state_delta(state, {
+        "intent": intent.value,
         "iteration_count": iteration_count,
-        "next_step": next_step,
-    }
+    })
     
-    logger.info(f"Output state - iteration_count: {iteration_count}")
-    logger.info(f"Output state - next_step: {next_step}")
-    logger.info(">>> NODE: classify_intent - END")
+    _log_node("classify_intent", "END", intent=intent.value, iteration_count=iteration_count)
     
     return result
 
@@ -105,52 +254,34 @@ async def fetch_order_data(state: AgentState) -> Dict[str, Any]:
     """
     Fetch order data using order service.
     
+    Runs in parallel with retrieve_policy on the first pass, so it must not write
+    state keys retrieve_policy also writes (it only writes order_data).
+    
     Args:
         state: Current agent state
         
     Returns:
         Updated state with order data
     """
-    logger.info(">>> NODE: fetch_order_data - START")
-    logger.info(f"Input state - user_message: {state.get('user_message')}")
-    logger.info(f"Input state - iteration_count: {state.get('iteration_count', 0)}")
-    logger.info(f"Input state - next_step: {state.get('next_step')}")
-    
-    # Increment iteration count if we're looping back (next_step indicates we need order data)
-    iteration_count = state.get("iteration_count", 0)
-    if state.get("next_step") == NextStep.FETCH_ORDER.value:
-        iteration_count += 1
-        logger.info(f"Incrementing iteration_count for loop: {iteration_count}")
+    _log_node("fetch_order_data", "START", user_message=state.get('user_message'))
     
     user_message = state.get("user_message", "")
     
-    # Extract order ID from message (improved extraction with punctuation removal)
-    order_id = None
+    # Extract order ID from message
     logger.info(f"Extracting order ID from message: '{user_message}'")
-    
-    # Try to find order ID in various formats
-    for word in user_message.split():
-        if word.startswith("ORD-") or word.startswith("#"):
-            # Remove # and all punctuation, keep alphanumeric and hyphens
-            order_id = re.sub(r'[#?.,!;:]', '', word).strip()
-            logger.info(f"Found order ID (raw): {order_id}")
-            break
-    
-    # If no order ID found, try to extract numeric ID from message
-    if not order_id:
-        # Look for patterns like "order #12345" or "order 12345"
-        numeric_match = re.search(r'(?:order|#)\s*(\d+)', user_message, re.IGNORECASE)
-        if numeric_match:
-            numeric_id = numeric_match.group(1)
-            logger.info(f"Found numeric order ID: {numeric_id}")
-            # Try to map to ORD- format (e.g., "12345" -> "ORD-12345" or find closest match)
-            # First try direct format conversion
-            order_id = f"ORD-{numeric_id.zfill(3)}"  # Pad to 3 digits: "12345" -> "ORD-12345"
-            logger.info(f"Trying formatted order ID: {order_id}")
+    order_id = extract_order_id(user_message)
     
     if not order_id:
         logger.warning("No order ID found in user message")
     
+    # On a loop-back, the order fetched earlier this turn is still in state; only re-query
+    # when the message refers to a different order
+    existing_order = state.get("order_data")
+    if existing_order and order_id and existing_order.get("order_id") in (order_id, f"ORD-{order_id.zfill(3)}"):
+        logger.info(f"Order {existing_order.get('order_id')} already in state, skipping fetch")
+        _log_node("fetch_order_data", "END", order_data="unchanged")
+        return {}
+    
     order_data = None
     if order_id:
         logger.info(f"Fetching order data for order_id: {order_id}")
@@ -158,29 +289,27 @@ async def fetch_order_data(state: AgentState) -> Dict[str, Any]:
             # First try exact match
             order_data = await db_order_service.get_order(order_id)
             
-            # If not found and order_id looks like a numeric ID, try to find matching order
-            if not order_data and order_id.isdigit():
-                logger.info(f"Exact match not found for {order_id}, checking available orders...")
-                # Try different formats
-                for fmt_id in [f"ORD-{order_id.zfill(3)}", f"ORD-{order_id}"]:
-                    logger.debug(f"Trying format: {fmt_id}")
-                    order_data = await db_order_service.get_order(fmt_id)
-                    if order_data:
-                        logger.info(f"Found order with format conversion: {fmt_id}")
-                        break
-            
-            # If still not found and order_id starts with ORD-, try without prefix
-            if not order_data and order_id.startswith("ORD-"):
-                numeric_part = order_id.replace("ORD-", "")
-                # Try to find order by matching numeric part
-                available_orders = ['ORD-001', 'ORD-002', 'ORD-003', 'ORD-004', 'ORD-005']
-                for avail_id in available_orders:
-                    if numeric_part in avail_id or avail_id.endswith(numeric_part):
-                        logger.info(f"Trying fuzzy match: {avail_id}")
-                        order_data = await db_order_service.get_order(avail_id)
-                        if order_data:
-                            logger.info(f"Found order with fuzzy match: {avail_id}")
-                            break
+            # If not found, look up every fallback candidate in one query, in priority order
+            if not order_data:
+                candidates = []
+                if order_id.isdigit():
+                    # Numeric ID: try different formats
+                    candidates = list(dict.fromkeys([f"ORD-{order_id.zfill(3)}", f"ORD-{order_id}"]))
+                elif order_id.startswith("ORD-"):
+                    # Try to find order by matching numeric part
+                    numeric_part = order_id.replace("ORD-", "")
+                    candidates = [
+                        avail_id for avail_id in _AVAILABLE_ORDER_IDS
+                        if numeric_part in avail_id or avail_id.endswith(numeric_part)
+                    ]
+                
+                if candidates:
+                    logger.info(f"Exact match not found for {order_id}, trying candidates: {candidates}")
+                    found_orders = await db_order_service.get_orders(candidates)
+                    matched_id = next((candidate for candidate in candidates if candidate in found_orders), None)
+                    if matched_id:
+                        order_data = found_orders[matched_id]
+                        logger.info(f"Found order with fallback match: {matched_id}")
             
             if order_data:
                 logger.info(f"Order data retrieved successfully: order_id={order_data.order_id}, status={order_data.status}")
@@ -191,18 +320,11 @@ async def fetch_order_data(state: AgentState) -> Dict[str, Any]:
     else:
         logger.info("Skipping order fetch - no order_id extracted")
     
-    next_step = NextStep.FETCH_POLICY.value if order_data else NextStep.NONE.value
-    
     result = {
         "order_data": order_data.model_dump(mode="json") if order_data else None,
-        "next_step": next_step,
-        "iteration_count": iteration_count,  # Include updated iteration count
     }
     
-    logger.info(f"Output state - order_data: {'present' if order_data else 'None'}")
-    logger.info(f"Output state - next_step: {next_step}")
-    logger.info(f"Output state - iteration_count: {iteration_count}")
-    logger.info(">>> NODE: fetch_order_data - END")
+    _log_node("fetch_order_data", "END", order_data='present' if order_data else 'None')
     
     return result
 
@@ -212,61 +334,59 @@ async def retrieve_policy(state: AgentState) -> Dict[str, Any]:
     """
     Retrieve policy context using RAG.
     
+    Runs in parallel with fetch_order_data on the first pass (see fetch_order_data
+    for which state keys it may write).
+    
     Args:
         state: Current agent state
         
     Returns:
-        Updated state with policy context
+        Updated state with policy chunks
     """
-    logger.info(">>> NODE: retrieve_policy - START")
-    logger.info(f"Input state - user_message: {state.get('user_message')}")
-    logger.info(f"Input state - order_data: {'present' if state.get('order_data') else 'None'}")
-    logger.info(f"Input state - iteration_count: {state.get('iteration_count', 0)}")
-    logger.info(f"Input state - next_step: {state.get('next_step')}")
-    
-    # Increment iteration count if we're looping back (next_step indicates we need policy data)
-    iteration_count = state.get("iteration_count", 0)
-    if state.get("next_step") == NextStep.FETCH_POLICY.value:
-        iteration_count += 1
-        logger.info(f"Incrementing iteration_count for loop: {iteration_count}")
+    _log_node("retrieve_policy", "START", user_message=state.get('user_message'), order_data='present' if state.get('order_data') else 'None')
     
     user_message = state.get("user_message", "")
     order_data = state.get("order_data")
     
     # Build query from user message and order context
+    # (order_data is only present here when looping back; on the first pass the order is fetched in parallel)
     query = user_message
     if order_data:
         query += f" order status: {order_data.get('status')}"
     
     logger.info(f"Query for policy retrieval: {query}")
     
-    # Query ChromaDB for policies
+    # Query ChromaDB for policies (repeated questions are served from the query cache)
     try:
-        logger.info("Querying ChromaDB for policies...")
-        policy_chunks = await chroma_client.query_policies(query, top_k=3)
+        policy_chunks = policy_query_cache.get((query, 3)) if settings.policy_query_cache_enabled else None
+        if policy_chunks is not None:
+            logger.info("Policy chunks served from query cache")
+        else:
+            logger.info("Querying ChromaDB for policies...")
+            policy_chunks = await chroma_client.query_policies(query, top_k=3)
+            # Don't cache empty results (e.g. policies not embedded yet)
+            if policy_chunks and settings.policy_query_cache_enabled:
+                policy_query_cache.set((query, 3), policy_chunks)
         logger.info(f"Retrieved {len(policy_chunks)} policy chunks")
-        for i, chunk in enumerate(policy_chunks):
-            logger.debug(f"Policy chunk {i+1}: score={chunk.get('score', 'N/A')}, text_length={len(chunk.get('text', ''))}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, chunk in enumerate(policy_chunks):
+                logger.debug(f"Policy chunk {i+1}: score={chunk.get('score', 'N/A')}, text_length={len(chunk.get('text', ''))}")
     except Exception as e:
         logger.error(f"Error querying policies: {str(e)}", exc_info=True)
         policy_chunks = []
     
-    # Combine policy chunks into context
-    policy_context = "\n\n".join([
-        f"Policy {i+1} (score: {chunk['score']:.2f}):\n{chunk['text']}"
-        for i, chunk in enumerate(policy_chunks)
-    ]) if policy_chunks else None
+    # Keep only what the prompt needs (text capped to bound LLM input tokens); the LLM client
+    # formats these straight into the prompt, so no joined context string is kept in state
+    policy_chunks = [
+        {"text": chunk["text"][:MAX_POLICY_CHARS], "score": chunk["score"]}
+        for chunk in policy_chunks
+    ] or None
     
     result = {
-        "policy_context": policy_context,
-        "next_step": NextStep.NONE.value,
-        "iteration_count": iteration_count,  # Include updated iteration count
+        "policy_chunks": policy_chunks,
     }
     
-    logger.info(f"Output state - policy_context: {'present' if policy_context else 'None'}")
-    logger.info(f"Output state - next_step: {result['next_step']}")
-    logger.info(f"Output state - iteration_count: {iteration_count}")
-    logger.info(">>> NODE: retrieve_policy - END")
+    _log_node("retrieve_policy", "END", policy_chunks=len(policy_chunks) if policy_chunks else 'None')
     
     return result
 
@@ -282,116 +402,91 @@ async def llm_reasoning(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with agent decision
     """
-    logger.info(">>> NODE: llm_reasoning - START")
-    logger.info(f"Input state - user_message: {state.get('user_message')}")
-    logger.info(f"Input state - order_data: {'present' if state.get('order_data') else 'None'}")
-    logger.info(f"Input state - policy_context: {'present' if state.get('policy_context') else 'None'}")
+    _log_node("llm_reasoning", "START", user_message=state.get('user_message'), order_data='present' if state.get('order_data') else 'None', policy_chunks='present' if state.get('policy_chunks') else 'None')
     
     user_message = state.get("user_message", "")
     conversation_history = state.get("conversation_history", [])
+    # order_data is already the JSON dump of a validated Order (see fetch_order_data),
+    # so it's passed to the LLM client as-is instead of being re-validated here
     order_data = state.get("order_data")
-    policy_context = state.get("policy_context")
-    
-    # Convert order_data dict back to Order if needed
-    order_obj = None
-    if order_data:
-        logger.info("Converting order_data dict to Order object...")
-        try:
-            from app.models.domain import Order, OrderStatus
-            from datetime import date as date_type
-            
-            # Handle date if it's a string
-            delivery_date = order_data["expected_delivery_date"]
-            if isinstance(delivery_date, str):
-                delivery_date = date_type.fromisoformat(delivery_date)
-            
-            order_obj = Order(
-                order_id=order_data["order_id"],
-                status=OrderStatus(order_data["status"]),
-                expected_delivery_date=delivery_date,
-                amount=order_data["amount"],
-                refundable=order_data["refundable"],
-            )
-            logger.info(f"Order object created: order_id={order_obj.order_id}, status={order_obj.status}")
-        except Exception as e:
-            logger.error(f"Error converting order_data: {str(e)}", exc_info=True)
-    
-    # Get LLM decision
-    order_dict = None
-    if order_obj:
-        order_dict = order_obj.model_dump(mode="json")
+    policy_chunks = state.get("policy_chunks")
     
     # Add current date to context for time-based decision making
-    from datetime import date
     current_date = date.today()
     logger.info(f"Current date: {current_date}")
     
     logger.info("Calling LLM client for agent decision...")
     try:
-        llm_response, next_step = await llm_client.get_agent_decision(
+        llm_response, next_step = await _get_agent_decision_coalesced(
             user_message=user_message,
             conversation_history=conversation_history,
-            order_data=order_dict,
-            policy_context=policy_context,
+            order_data=order_data,
+            policy_chunks=policy_chunks,
             current_date=current_date,
         )
         logger.info(f"LLM response received - action: {llm_response.action}, confidence: {llm_response.confidence}")
-        logger.info(f"LLM response - final_answer: {llm_response.final_answer[:100]}..." if len(llm_response.final_answer) > 100 else f"LLM response - final_answer: {llm_response.final_answer}")
         logger.info(f"LLM response - next_step: {next_step}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"LLM response - final_answer: {llm_response.final_answer[:100]}..." if len(llm_response.final_answer) > 100 else f"LLM response - final_answer: {llm_response.final_answer}")
     except Exception as e:
         logger.error(f"Error getting LLM decision: {str(e)}", exc_info=True)
         raise
     
-    result = {
+    # One increment per reasoning pass; should_require_approval stops looping back past MAX_ITERATIONS
+    iteration_count = state.get("iteration_count", 0) + 1
+    
+    result = _state_delta(state, {
         "agent_decision": llm_response.model_dump(mode="json"),
         "confidence": llm_response.confidence,
         "next_step": next_step,  # Set next_step in state from LLM decision
-    }
+    })
+    result["iteration_count"] = iteration_count  # Always changes
     
-    logger.info(f"Output state - agent_decision: present")
-    logger.info(f"Output state - confidence: {llm_response.confidence}")
-    logger.info(f"Output state - next_step: {next_step}")
-    logger.info(">>> NODE: llm_reasoning - END")
+    _log_node("llm_reasoning", "END", confidence=llm_response.confidence, next_step=next_step, iteration_count=iteration_count)
     
     return result
 
 
 @traceable(name="output_guardrails")
-def output_guardrails(state: AgentState) -> Dict[str, Any]:
+async def output_guardrails(state: AgentState) -> Dict[str, Any]:
     """
     Validate LLM output using guardrails.
     
+    Async so it runs on the event loop: as a sync node LangGraph would dispatch it to
+    the thread pool, which costs more than the in-memory Pydantic validation itself.
+    
     Args:
         state: Current agent state
         
     Returns:
         Updated state with validated decision
     """
-    logger.info(">>> NODE: output_guardrails - START")
-    logger.info(f"Input state - agent_decision: {'present' if state.get('agent_decision') else 'None'}")
+    _log_node("output_guardrails", "START", agent_decision='present' if state.get('agent_decision') else 'None')
     
     agent_decision_dict = state.get("agent_decision")
     
     if not agent_decision_dict:
         logger.warning("No agent_decision in state, creating fallback response")
-        # Fallback if no decision
-        from app.models.domain import LLMResponse, ActionType, NextStep
-        fallback = LLMResponse(
-            analysis="No decision available",
-            final_answer="I apologize, but I couldn't process your request.",
-            action=ActionType.NONE,
-            order_id=None,
-            confidence=0.0,
-            requires_human_approval=False,
-        )
+        # Fallback if no decision (copied so later writes to state can't alter the shared dump)
         result = {
-            "agent_decision": fallback.model_dump(mode="json"),
-            "next_step": NextStep.NONE.value,
+            "agent_decision": dict(_FALLBACK_DECISION_JSON),
+            "decision": Decision.from_llm_response(_FALLBACK_DECISION),
+            "next_step": _NO_NEXT_STEP,
         }
         logger.info("Returning fallback response")
-        logger.info(">>> NODE: output_guardrails - END")
+        _log_node("output_guardrails", "END")
         return result
     
+    # Fast path: llm_reasoning stores a validated LLMResponse dump, and the business rules
+    # only constrain write actions, so confident read-only replies skip the validator
+    confidence = agent_decision_dict.get("confidence")
+    if agent_decision_dict.get("action") == _NO_ACTION and confidence >= GUARDRAILS_FAST_PATH_CONFIDENCE:
+        logger.info(f"Skipping validation for read-only decision (confidence: {confidence})")
+        _log_node("output_guardrails", "END")
+        # Already validated, so rebuild the model without validating it again
+        decision = LLMResponse.model_construct(**{**agent_decision_dict, "action": ActionType.NONE})
+        return {"decision": Decision.from_llm_response(decision)}
+    
     logger.info(f"Validating agent_decision: action={agent_decision_dict.get('action')}, confidence={agent_decision_dict.get('confidence')}")
     
     # Validate using guardrails
@@ -402,14 +497,13 @@ def output_guardrails(state: AgentState) -> Dict[str, Any]:
         logger.error(f"Validation error: {str(e)}", exc_info=True)
         raise
     
-    result = {
+    result = _state_delta(state, {
         "agent_decision": validated_decision.model_dump(mode="json"),
+        "decision": Decision.from_llm_response(validated_decision),  # Parsed once for routing and later nodes
         "confidence": validated_decision.confidence,
-    }
+    })
     
-    logger.info(f"Output state - agent_decision: validated")
-    logger.info(f"Output state - confidence: {validated_decision.confidence}")
-    logger.info(">>> NODE: output_guardrails - END")
+    _log_node("output_guardrails", "END", confidence=validated_decision.confidence)
     
     return result
 
@@ -430,35 +524,23 @@ async def human_approval(state: AgentState, approval_service) -> Dict[str, Any]:
     Returns:
         Updated state with approval_id and conversation_history (approval_status will be set by check_approval_status)
     """
-    logger.info(">>> NODE: human_approval - START")
-    logger.info(f"Input state - agent_decision: {'present' if state.get('agent_decision') else 'None'}")
-    logger.info(f"Input state - approval_id: {state.get('approval_id')}")
+    _log_node("human_approval", "START", agent_decision='present' if state.get('agent_decision') else 'None', approval_id=state.get('approval_id'))
     
     # Update conversation history first (will be merged with result at the end)
     history_update = _update_conversation_history(state)
     
-    agent_decision_dict = state.get("agent_decision")
-    if not agent_decision_dict:
-        logger.warning("No agent_decision in state, returning history update only")
-        logger.info(">>> NODE: human_approval - END")
-        return history_update
-    
-    from app.models.domain import LLMResponse, ActionType
-    # Normalize the dict to ensure proper enum types
-    try:
-        normalized_dict = normalize_llm_response_dict(agent_decision_dict)
-        decision = LLMResponse(**normalized_dict)
-        logger.info(f"Decision parsed - action: {decision.action}, order_id: {decision.order_id}")
-    except Exception as e:
-        logger.error(f"Error parsing agent_decision: {str(e)}", exc_info=True)
-        logger.info(">>> NODE: human_approval - END")
-        # Return history update even on error
+    # Decision was parsed and validated by output_guardrails
+    decision = state.get("decision")
+    if not decision:
+        logger.warning("No decision in state, returning history update only")
+        _log_node("human_approval", "END")
         return history_update
+    logger.info(f"Decision - action: {decision.action}, order_id: {decision.order_id}")
     
     # Only create approval if action is not NONE
-    if decision.action == ActionType.NONE:
+    if decision.action is ActionType.NONE:
         logger.info("Action is NONE, no approval needed")
-        logger.info(">>> NODE: human_approval - END")
+        _log_node("human_approval", "END")
         # Return history update
         return history_update
     
@@ -466,13 +548,9 @@ async def human_approval(state: AgentState, approval_service) -> Dict[str, Any]:
     approval_id = state.get("approval_id")
     if approval_id:
         logger.info(f"Approval already exists: {approval_id}, skipping creation")
-        logger.info(">>> NODE: human_approval - END")
-        # Return existing approval_id with history update
-        result = {
-            "approval_id": approval_id,
-        }
-        result.update(history_update)
-        return result
+        _log_node("human_approval", "END")
+        # approval_id is already in state; only write the history update
+        return history_update
     
     # Create new approval request
     logger.info(f"Creating new approval request - order_id: {decision.order_id}, action: {decision.action}")
@@ -490,14 +568,12 @@ async def human_approval(state: AgentState, approval_service) -> Dict[str, Any]:
     # Access conversation_id from state (stored by API route)
     conversation_id = state.get("_conversation_id")
     logger.info(f"Checking for _conversation_id in state: {conversation_id}")
-    logger.debug(f"Full state keys: {list(state.keys())}")
+    logger.debug("Full state keys: %s", list(state.keys()))
     
     if conversation_id:
         logger.info(f"Storing approval mapping: {approval.approval_id} -> {conversation_id}")
-        # Import here to avoid circular dependency
-        from app.api.approval_mapping import approval_to_conversation
-        approval_to_conversation[approval.approval_id] = conversation_id
-        logger.info(f"Mapping stored successfully. Current mappings: {list(approval_to_conversation.keys())}")
+        await approval_store.set(approval.approval_id, conversation_id)
+        logger.info("Mapping stored successfully")
     else:
         logger.warning("No conversation_id in state, cannot store approval mapping")
         logger.warning(f"State keys available: {list(state.keys())}")
@@ -509,42 +585,37 @@ async def human_approval(state: AgentState, approval_service) -> Dict[str, Any]:
     }
     result.update(history_update)
     
-    logger.info(f"Output state - approval_id: {approval.approval_id}")
-    logger.info(f"Output state - conversation_history: {'updated' if history_update else 'no update'}")
-    logger.info(">>> NODE: human_approval - END")
+    _log_node("human_approval", "END", approval_id=approval.approval_id, conversation_history='updated' if history_update else 'no update')
     
     return result
 
 
 @traceable(name="check_approval_status")
-async def check_approval_status(state: AgentState, approval_service) -> Dict[str, Any]:
+async def check_approval_status(state: AgentState, approval_service) -> Command[Literal["execute_write_action", "format_final_response"]]:
     """
     Check current approval status and update state.
     
     This node validates the approval status after human_approval node.
     If status is PENDING, it raises an interrupt to wait for approval.
-    If APPROVED, it allows execution to proceed.
-    If REJECTED, it routes to final response.
+    If APPROVED, it routes to execute_write_action.
+    Otherwise (REJECTED, or the status could not be read), it routes to final response.
     
     Args:
         state: Current agent state
         approval_service: Approval service instance
         
     Returns:
-        Updated state with current approval_status
+        Command with current approval_status and the next node
     """
     # from langgraph import Interrupt
-    from app.models.domain import ApprovalStatus
     
-    logger.info(">>> NODE: check_approval_status - START")
-    logger.info(f"Input state - approval_id: {state.get('approval_id')}")
-    logger.info(f"Input state - approval_status: {state.get('approval_status')}")
+    _log_node("check_approval_status", "START", approval_id=state.get('approval_id'), approval_status=state.get('approval_status'))
     
     approval_id = state.get("approval_id")
     if not approval_id:
         logger.warning("No approval_id in state, cannot check approval status")
-        logger.info(">>> NODE: check_approval_status - END")
-        return {}
+        _log_node("check_approval_status", "END")
+        return Command(goto="format_final_response")
     
     # Fetch current approval status from database
     logger.info(f"Fetching approval status for approval_id: {approval_id}")
@@ -552,13 +623,13 @@ async def check_approval_status(state: AgentState, approval_service) -> Dict[str
         approval = await approval_service.get_approval(approval_id)
         if not approval:
             logger.error(f"Approval {approval_id} not found in database")
-            logger.info(">>> NODE: check_approval_status - END")
-            return {}
+            _log_node("check_approval_status", "END")
+            return Command(goto="format_final_response")
         
         logger.info(f"Approval status retrieved: {approval.status}")
         
         result = {
-            "approval_status": approval.status,
+            "approval_status": ApprovalStatus(approval.status),  # always an enum member so routers can compare by identity
         }
         
         # Note: Conversation history is now updated in human_approval node before interrupt
@@ -568,18 +639,19 @@ async def check_approval_status(state: AgentState, approval_service) -> Dict[str
             logger.info(">>> NODE: check_approval_status - END (interrupting)")
             # raise Interrupt()
         
-        # If APPROVED or REJECTED, return status for routing
-        logger.info(f"Approval status is {approval.status}, proceeding with routing")
-        logger.info(">>> NODE: check_approval_status - END")
-        return result
+        # If APPROVED execute the action, otherwise go straight to the final response
+        goto = "execute_write_action" if result["approval_status"] is ApprovalStatus.APPROVED else "format_final_response"
+        logger.info(f"Approval status is {approval.status}, ROUTING: -> {goto}")
+        _log_node("check_approval_status", "END")
+        return Command(update=result, goto=goto)
         
     # except Interrupt:
     #     # Re-raise interrupt
     #     raise
     except Exception as e:
         logger.error(f"Error fetching approval status: {str(e)}", exc_info=True)
-        logger.info(">>> NODE: check_approval_status - END")
-        return {}
+        _log_node("check_approval_status", "END")
+        return Command(goto="format_final_response")
 
 
 @traceable(name="execute_write_action")
@@ -593,26 +665,15 @@ async def execute_write_action(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with execution result
     """
-    logger.info(">>> NODE: execute_write_action - START")
-    logger.info(f"Input state - agent_decision: {'present' if state.get('agent_decision') else 'None'}")
-    logger.info(f"Input state - approval_status: {state.get('approval_status')}")
+    _log_node("execute_write_action", "START", agent_decision='present' if state.get('agent_decision') else 'None', approval_status=state.get('approval_status'))
     
-    agent_decision_dict = state.get("agent_decision")
-    if not agent_decision_dict:
-        logger.warning("No agent_decision in state, returning empty update")
-        logger.info(">>> NODE: execute_write_action - END")
-        return {}
-    
-    from app.models.domain import LLMResponse, ActionType
-    # Normalize the dict to ensure proper enum types
-    try:
-        normalized_dict = normalize_llm_response_dict(agent_decision_dict)
-        decision = LLMResponse(**normalized_dict)
-        logger.info(f"Decision parsed - action: {decision.action}, order_id: {decision.order_id}")
-    except Exception as e:
-        logger.error(f"Error parsing agent_decision: {str(e)}", exc_info=True)
-        logger.info(">>> NODE: execute_write_action - END")
+    # Decision was parsed and validated by output_guardrails
+    decision = state.get("decision")
+    if not decision:
+        logger.warning("No decision in state, returning empty update")
+        _log_node("execute_write_action", "END")
         return {}
+    logger.info(f"Decision - action: {decision.action}, order_id: {decision.order_id}")
     
     # Execute action
     logger.info(f"Executing action: {decision.action} for order: {decision.order_id}")
@@ -635,14 +696,13 @@ async def execute_write_action(state: AgentState) -> Dict[str, Any]:
         "execution_result": result,
     }
     
-    logger.info(f"Output state - execution_result: {result}")
-    logger.info(">>> NODE: execute_write_action - END")
+    _log_node("execute_write_action", "END", execution_result=result)
     
     return output
 
 
 @traceable(name="format_final_response")
-def format_final_response(state: AgentState) -> Dict[str, Any]:
+async def format_final_response(state: AgentState) -> Dict[str, Any]:
     """
     Format final response to user.
     
@@ -652,39 +712,24 @@ def format_final_response(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with final response
     """
-    logger.info(">>> NODE: format_final_response - START")
-    logger.info(f"Input state - agent_decision: {'present' if state.get('agent_decision') else 'None'}")
-    logger.info(f"Input state - execution_result: {'present' if state.get('execution_result') else 'None'}")
+    _log_node("format_final_response", "START", agent_decision='present' if state.get('agent_decision') else 'None', execution_result='present' if state.get('execution_result') else 'None')
     
-    agent_decision_dict = state.get("agent_decision")
+    # Decision was parsed and validated by output_guardrails
+    decision = state.get("decision")
     execution_result = state.get("execution_result")
     
-    if not agent_decision_dict:
-        logger.warning("No agent_decision in state, returning default fallback response")
-        result = {
-            "final_response": "I apologize, but I couldn't process your request.",
-        }
-        logger.info(f"Output state - final_response: {result['final_response']}")
-        logger.info(">>> NODE: format_final_response - END")
-        return result
-    
-    from app.models.domain import LLMResponse
-    # Normalize the dict to ensure proper enum types
-    try:
-        normalized_dict = normalize_llm_response_dict(agent_decision_dict)
-        decision = LLMResponse(**normalized_dict)
-        logger.info(f"Decision parsed - final_answer length: {len(decision.final_answer)}")
-    except Exception as e:
-        logger.error(f"Error parsing agent_decision: {str(e)}", exc_info=True)
+    if not decision:
+        logger.warning("No decision in state, returning default fallback response")
         result = {
             "final_response": "I apologize, but I couldn't process your request.",
         }
-        logger.info(">>> NODE: format_final_response - END")
+        _log_node("format_final_response", "END", final_response=result['final_response'])
         return result
     
     # Build final response
     response = decision.final_answer
-    logger.info(f"Base response: {response[:100]}..." if len(response) > 100 else f"Base response: {response}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Base response: {response[:100]}..." if len(response) > 100 else f"Base response: {response}")
     
     # Add execution result if available
     if execution_result and execution_result.get("success"):
@@ -707,10 +752,9 @@ def format_final_response(state: AgentState) -> Dict[str, Any]:
     # Merge history update if any (will be empty dict if already updated)
     result.update(history_update)
     
-    logger.info(f"Output state - final_response length: {len(response)}")
-    logger.info(f"Output state - final_response: {response[:200]}..." if len(response) > 200 else f"Output state - final_response: {response}")
-    logger.info(f"Output state - conversation_history: {'updated' if history_update else 'no update (already exists)'}")
-    logger.info(">>> NODE: format_final_response - END")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Output state - final_response: {response[:200]}..." if len(response) > 200 else f"Output state - final_response: {response}")
+    _log_node("format_final_response", "END", final_response_length=len(response), conversation_history='updated' if history_update else 'no update (already exists)')
     
     return result
 
@@ -1,20 +1,44 @@
 """LangGraph state definition."""
-from typing import TypedDict, List, Dict, Any, Optional
-from app.models.domain import Order, LLMResponse, ApprovalStatus
+import operator
+from dataclasses import dataclass
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
+from app.models.domain import Order, LLMResponse, ApprovalStatus, ActionType
+
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    """Validated agent decision, parsed once in output_guardrails for routers and downstream nodes."""
+    action: ActionType
+    order_id: Optional[str]
+    final_answer: str
+    requires_human_approval: bool
+
+    @classmethod
+    def from_llm_response(cls, response: LLMResponse) -> "Decision":
+        """Build from a validated LLMResponse."""
+        return cls(
+            action=response.action,
+            order_id=response.order_id,
+            final_answer=response.final_answer,
+            requires_human_approval=response.requires_human_approval,
+        )
 
 
 class AgentState(TypedDict):
     """State for the LangGraph agent."""
     # User input
     user_message: str
-    conversation_history: List[Dict[str, str]]
+    # Append-only: nodes return just the new messages and LangGraph concatenates them
+    conversation_history: Annotated[List[Dict[str, str]], operator.add]
+    intent: Optional[str]  # Intent value, set by classify_intent
     
     # Data
     order_data: Optional[Order]
-    policy_context: Optional[str]
+    policy_chunks: Optional[List[Dict[str, Any]]]  # Retrieved policies ({text, score}), formatted into the prompt by the LLM client
     
     # Agent decision
     agent_decision: Optional[LLMResponse]
+    decision: Optional[Decision]  # Parsed form of agent_decision, set by output_guardrails
     
     # Approval
     approval_id: Optional[str]
@@ -1,7 +1,7 @@
 """Output validation using Pydantic."""
-import json
 import logging
 from typing import Dict, Any, Optional
+import orjson
 from langsmith import traceable
 from app.models.domain import LLMResponse, ActionType, NextStep
 from app.llm.client import normalize_llm_response_dict
@@ -90,7 +90,8 @@ class GuardrailsValidator:
         """
         # Include error message in response for debugging (remove in production)
         # Temporarily include error in final_answer to help debug
-        return LLMResponse(
+        # model_construct: every field is set here with a known-valid value, so skip validation
+        return LLMResponse.model_construct(
             analysis=f"Validation error occurred: {error_message}",
             final_answer=(
                 f"I apologize, but I encountered an error processing your request. "
@@ -115,8 +116,8 @@ class GuardrailsValidator:
         """
         try:
             # Parse JSON
-            parsed = json.loads(json_string)
+            parsed = orjson.loads(json_string)
             return self.validate(parsed)
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             return self._get_fallback_response(f"Invalid JSON: {e}")
 
@@ -1,16 +1,88 @@
 """OpenAI LLM client wrapper with structured output support."""
-import json
 import logging
 from datetime import date
 from typing import Optional, Dict, Any, List, Tuple
+import orjson
 from openai import AsyncOpenAI
-from langchain_openai import ChatOpenAI
 from langsmith import traceable
 from app.config import settings
-from app.models.domain import LLMResponse, ActionType
+from app.llm.http_client import get_http_client
+from app.models.domain import LLMResponse, ActionType, NextStep
 
 logger = logging.getLogger(__name__)
 
+# Action string -> ActionType, so invalid actions fall back to NONE without raising
+_ACTION_LOOKUP = {action.value: action for action in ActionType}
+
+# Defaults for missing/None fields, and for text fields the LLM left empty
+_VALUE_DEFAULTS = {"confidence": 0.0}
+_TEXT_DEFAULTS = {
+    "analysis": "No analysis provided",
+    "final_answer": "I apologize, but I couldn't generate a response.",
+}
+
+# OpenAI structured-outputs schema for agent decisions (llm_strict_schema).
+# Written by hand: strict mode needs every property required and no extra keys,
+# which LLMResponse.model_json_schema() (defaults, $defs) doesn't satisfy.
+AGENT_DECISION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "agent_decision",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "analysis": {"type": "string"},
+                "final_answer": {"type": "string"},
+                "action": {"type": "string", "enum": [action.value for action in ActionType]},
+                "order_id": {"type": ["string", "null"]},
+                "confidence": {"type": "number"},
+                "requires_human_approval": {"type": "boolean"},
+                "next_step": {"type": "string", "enum": [step.value for step in NextStep]},
+            },
+            "required": [
+                "analysis", "final_answer", "action", "order_id",
+                "confidence", "requires_human_approval", "next_step",
+            ],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# System prompt for agent decisions (get_agent_decision)
+AGENT_SYSTEM_PROMPT = """You are an AI customer support agent.
+
+Rules:
+- You must respond ONLY in valid JSON
+- You may NEVER execute actions
+- You may ONLY propose actions
+- If information is missing, ask for tools
+- ALWAYS provide a helpful final_answer - NEVER return null or empty string
+- If order data is missing, explain that you need to fetch the order information
+- If you cannot answer due to missing data, provide a helpful message explaining what information is needed
+- Be conversational and helpful in your final_answer
+- Use the Current Date provided in context to determine if orders are delayed
+- Compare Current Date with expected_delivery_date to calculate delay duration
+- Apply time-based cancellation rules (e.g., 7+ days delayed = auto-eligible for cancellation)
+
+Output schema:
+{
+  "analysis": "string",
+  "final_answer": "string",  // REQUIRED: Must always be a non-empty string, never null
+  "action": "NONE | CANCEL_ORDER | REFUND_ORDER",
+  "order_id": "string | null",
+  "confidence": number,
+  "requires_human_approval": boolean,
+  "next_step": "NONE | FETCH_ORDER | FETCH_POLICY"
+}
+
+IMPORTANT: final_answer must ALWAYS be a non-empty string. If you need more information, say something like:
+- "I need to fetch your order information to answer your question. Let me retrieve that for you."
+- "I don't have the order details yet. I'll fetch that information now."
+- Never return null or empty string for final_answer.
+
+Do NOT add extra fields."""
+
 
 def normalize_llm_response_dict(response_dict: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -25,30 +97,19 @@ def normalize_llm_response_dict(response_dict: Dict[str, Any]) -> Dict[str, Any]
     Returns:
         Normalized dictionary ready for LLMResponse creation
     """
-    # Create a copy to avoid mutating the original
-    normalized = response_dict.copy()
-    
-    # Ensure all required fields have defaults if missing or None
-    if not normalized.get("analysis") or normalized.get("analysis") is None:
-        normalized["analysis"] = "No analysis provided"
-    
-    if not normalized.get("final_answer") or normalized.get("final_answer") is None:
-        normalized["final_answer"] = "I apologize, but I couldn't generate a response."
-    
-    if normalized.get("confidence") is None:
-        normalized["confidence"] = 0.0
+    # Build a new dict (the original isn't mutated): None values fall back to the defaults
+    normalized = {**_VALUE_DEFAULTS, **{key: value for key, value in response_dict.items() if value is not None}}
     
-    if normalized.get("requires_human_approval") is None:
-        normalized["requires_human_approval"] = False
+    # Empty text counts as missing too, so the user never gets a blank answer
+    for key, default in _TEXT_DEFAULTS.items():
+        if not normalized.get(key):
+            normalized[key] = default
     
     # Convert action string to ActionType enum if needed
     action_value = normalized.get("action", "NONE")
     if isinstance(action_value, str):
-        try:
-            action = ActionType(action_value)
-        except ValueError:
-            # Fallback to NONE if invalid action
-            action = ActionType.NONE
+        # Fallback to NONE if invalid action
+        action = _ACTION_LOOKUP.get(action_value, ActionType.NONE)
         normalized["action"] = action
     elif not isinstance(action_value, ActionType):
         # If it's neither string nor ActionType, default to NONE
@@ -57,10 +118,8 @@ def normalize_llm_response_dict(response_dict: Dict[str, Any]) -> Dict[str, Any]
     else:
         action = action_value
     
-    # Ensure requires_human_approval is set correctly based on action
-    if action != ActionType.NONE:
-        # If action is not NONE, requires_human_approval must be True
-        normalized["requires_human_approval"] = True
+    # Any action other than NONE always requires human approval
+    normalized["requires_human_approval"] = bool(normalized.get("requires_human_approval")) or action is not ActionType.NONE
     
     return normalized
 
@@ -70,11 +129,11 @@ class LLMClient:
     
     def __init__(self):
         """Initialize OpenAI client."""
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
-        self.chat_model = ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
+        # Shared connection pool (keep-alive, HTTP/2 when available) instead of one per client
+        self.client = AsyncOpenAI(
             api_key=settings.openai_api_key,
+            http_client=get_http_client(),
+            max_retries=settings.llm_max_retries,
         )
     
     @traceable(name="llm_chat_completion")
@@ -96,8 +155,8 @@ class LLMClient:
             Parsed JSON response as dictionary
         """
         logger.info("LLM: get_structured_response - START")
-        logger.debug(f"LLM: System prompt length: {len(system_prompt)}")
-        logger.debug(f"LLM: Number of messages: {len(messages)}")
+        logger.debug("LLM: System prompt length: %s", len(system_prompt))
+        logger.debug("LLM: Number of messages: %s", len(messages))
         
         try:
             # Prepare messages with system prompt
@@ -108,7 +167,7 @@ class LLMClient:
             
             # Build request parameters
             request_params = {
-                "model": "gpt-4",
+                "model": settings.llm_model,
                 "messages": formatted_messages,
                 "temperature": 0.7,
             }
@@ -127,21 +186,22 @@ class LLMClient:
                 logger.error("LLM: Empty response from LLM")
                 raise ValueError("Empty response from LLM")
             
-            logger.debug(f"LLM: Response content length: {len(content)}")
-            logger.debug(f"LLM: Response content preview: {content[:200]}...")
+            logger.debug("LLM: Response content length: %s", len(content))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LLM: Response content preview: %s...", content[:200])
             
             # Parse JSON response
             try:
-                parsed = json.loads(content)
+                parsed = orjson.loads(content)
                 logger.info("LLM: JSON parsed successfully")
-                logger.debug(f"LLM: Parsed response keys: {list(parsed.keys()) if isinstance(parsed, dict) else 'Not a dict'}")
+                logger.debug("LLM: Parsed response keys: %s", list(parsed.keys()) if isinstance(parsed, dict) else 'Not a dict')
                 return parsed
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 logger.error(f"LLM: JSON decode error: {str(e)}")
                 logger.error(f"LLM: Raw content: {content}")
                 raise ValueError(f"Invalid JSON response from LLM: {e}")
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"LLM: JSON decode error: {str(e)}", exc_info=True)
             raise ValueError(f"Invalid JSON response from LLM: {e}")
         except Exception as e:
@@ -154,7 +214,7 @@ class LLMClient:
         user_message: str,
         conversation_history: List[Dict[str, str]],
         order_data: Optional[Dict[str, Any]] = None,
-        policy_context: Optional[str] = None,
+        policy_chunks: Optional[List[Dict[str, Any]]] = None,
         current_date: Optional[date] = None,
     ) -> Tuple[LLMResponse, str]:
         """
@@ -164,103 +224,97 @@ class LLMClient:
             user_message: Current user message
             conversation_history: Previous conversation messages
             order_data: Optional order data
-            policy_context: Optional policy context from RAG
+            policy_chunks: Optional policy chunks from RAG ({text, score} dicts)
             current_date: Optional current date for time-based decision making
             
         Returns:
             Tuple of (LLMResponse with structured decision, next_step value)
         """
         logger.info("LLM: get_agent_decision - START")
-        logger.info(f"LLM: user_message: {user_message}")
-        logger.info(f"LLM: conversation_history length: {len(conversation_history)}")
-        logger.info(f"LLM: order_data: {'present' if order_data else 'None'}")
-        logger.info(f"LLM: policy_context: {'present' if policy_context else 'None'}")
-        logger.info(f"LLM: current_date: {current_date}")
+        logger.debug("LLM: user_message: %s", user_message)
+        logger.debug("LLM: conversation_history length: %s", len(conversation_history))
+        logger.debug("LLM: order_data: %s", 'present' if order_data else 'None')
+        logger.debug("LLM: policy_chunks: %s", len(policy_chunks) if policy_chunks else 'None')
+        logger.debug("LLM: current_date: %s", current_date)
         
-        system_prompt = """You are an AI customer support agent.
-
-Rules:
-- You must respond ONLY in valid JSON
-- You may NEVER execute actions
-- You may ONLY propose actions
-- If information is missing, ask for tools
-- ALWAYS provide a helpful final_answer - NEVER return null or empty string
-- If order data is missing, explain that you need to fetch the order information
-- If you cannot answer due to missing data, provide a helpful message explaining what information is needed
-- Be conversational and helpful in your final_answer
-- Use the Current Date provided in context to determine if orders are delayed
-- Compare Current Date with expected_delivery_date to calculate delay duration
-- Apply time-based cancellation rules (e.g., 7+ days delayed = auto-eligible for cancellation)
-
-Output schema:
-{
-  "analysis": "string",
-  "final_answer": "string",  // REQUIRED: Must always be a non-empty string, never null
-  "action": "NONE | CANCEL_ORDER | REFUND_ORDER",
-  "order_id": "string | null",
-  "confidence": number,
-  "requires_human_approval": boolean,
-  "next_step": "NONE | FETCH_ORDER | FETCH_POLICY"
-}
-
-IMPORTANT: final_answer must ALWAYS be a non-empty string. If you need more information, say something like:
-- "I need to fetch your order information to answer your question. Let me retrieve that for you."
-- "I don't have the order details yet. I'll fetch that information now."
-- Never return null or empty string for final_answer.
-
-Do NOT add extra fields."""
-
         # Build context
         context_parts = []
         if current_date:
             context_parts.append(f"Current Date: {current_date.isoformat()}")
-            logger.debug(f"LLM: Added current_date to context: {current_date}")
+            logger.debug("LLM: Added current_date to context: %s", current_date)
         if order_data:
-            context_parts.append(f"Order Data: {json.dumps(order_data, default=str)}")
-            logger.debug(f"LLM: Added order_data to context (length: {len(context_parts[-1])})")
-        if policy_context:
-            context_parts.append(f"Policy Context: {policy_context}")
-            logger.debug(f"LLM: Added policy_context to context (length: {len(context_parts[-1])})")
+            context_parts.append(f"Order Data: {orjson.dumps(order_data, default=str).decode()}")
+            logger.debug("LLM: Added order_data to context (length: %s)", len(context_parts[-1]))
+        if policy_chunks:
+            context_parts.append("Policy Context: " + "\n\n".join(
+                f"Policy {i} (score: {chunk['score']:.2f}):\n{chunk['text']}"
+                for i, chunk in enumerate(policy_chunks, 1)
+            ))
+            logger.debug("LLM: Added policy_chunks to context (length: %s)", len(context_parts[-1]))
         
         context = "\n\n".join(context_parts) if context_parts else "No additional context available."
-        logger.debug(f"LLM: Total context length: {len(context)}")
+        logger.debug("LLM: Total context length: %s", len(context))
         
         # Build messages
-        messages = []
-        for msg in conversation_history:
-            messages.append(msg)
-        
         user_content = f"Context:\n{context}\n\nUser Message: {user_message}"
-        messages.append({
-            "role": "user",
-            "content": user_content
-        })
-        logger.debug(f"LLM: User message content length: {len(user_content)}")
+        messages = [
+            *conversation_history,
+            {
+                "role": "user",
+                "content": user_content
+            },
+        ]
+        logger.debug("LLM: User message content length: %s", len(user_content))
         
         # Get structured response
         logger.info("LLM: Calling get_structured_response...")
+        strict_schema = settings.llm_strict_schema
         response_dict = await self.get_structured_response(
             messages=messages,
-            system_prompt=system_prompt,
+            system_prompt=AGENT_SYSTEM_PROMPT,
+            response_format=AGENT_DECISION_RESPONSE_FORMAT if strict_schema else None,
         )
         
         # Log raw response for debugging
-        logger.info(f"LLM: Raw response received: {response_dict}")
+        logger.debug("LLM: Raw response received: %s", response_dict)
         
         # Extract next_step before creating LLMResponse (since it's not in the model anymore)
         next_step = response_dict.pop("next_step", "NONE")
         logger.info(f"LLM: Extracted next_step: {next_step}")
         
+        if strict_schema:
+            # The server already enforced JSON types, enums and required keys, so skip the
+            # defensive defaulting; model validation still checks the confidence range and
+            # the order_id/approval rules for actions (unknown actions fail validation)
+            action = _ACTION_LOOKUP.get(response_dict["action"], response_dict["action"])
+            decision_dict = {
+                "analysis": response_dict["analysis"],
+                "final_answer": response_dict["final_answer"] or _TEXT_DEFAULTS["final_answer"],
+                "action": action,
+                "order_id": response_dict["order_id"],
+                "confidence": response_dict["confidence"],
+                "requires_human_approval": response_dict["requires_human_approval"] or action is not ActionType.NONE,
+            }
+            try:
+                llm_response = LLMResponse.model_validate(decision_dict)
+            except Exception as e:
+                logger.error(f"LLM: Error creating LLMResponse (strict schema): {str(e)}", exc_info=True)
+                logger.error(f"LLM: decision_dict: {decision_dict}")
+                raise
+            logger.info(f"LLM: LLMResponse created (strict schema) - action: {llm_response.action}, confidence: {llm_response.confidence}")
+            logger.info("LLM: get_agent_decision - END")
+            return llm_response, next_step
+        
         # Normalize response dict (convert action to enum, fix requires_human_approval, add defaults)
         logger.info("LLM: Normalizing response dict...")
         normalized_dict = normalize_llm_response_dict(response_dict)
         
         # Log normalized response for debugging
-        logger.info(f"LLM: Normalized response: {normalized_dict}")
+        logger.debug("LLM: Normalized response: %s", normalized_dict)
         
         # Validate and return both LLMResponse and next_step
         try:
-            llm_response = LLMResponse(**normalized_dict)
+            llm_response = LLMResponse.model_validate(normalized_dict)
             logger.info(f"LLM: LLMResponse created - action: {llm_response.action}, confidence: {llm_response.confidence}")
             logger.info("LLM: get_agent_decision - END")
             return llm_response, next_step
@@ -1,4 +1,5 @@
 """FastAPI main application."""
+import asyncio
 import logging
 import sys
 from pathlib import Path
@@ -8,28 +9,28 @@ from fastapi.middleware.cors import CORSMiddleware
 from datetime import date, timedelta
 from app.config import settings
 from app.models.database import init_db, AsyncSessionLocal
-from app.models.domain import Order, OrderStatus
+from app.models.domain import OrderStatus
 from app.actions.order_repository import OrderRepository
 from app.observability.tracing import setup_observability
+from app.graph.checkpointer import init_checkpointer, close_checkpointer, is_persistent_checkpointer
+from app.llm.http_client import close_http_client
+from app.api.approval_mapping import approval_store
 from app.api.routes import router
 from app.rag.chroma_client import ChromaClient
+from app.graph.nodes import chroma_client as policy_chroma_client
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=settings.log_level.upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout)
     ]
 )
 
-# Set specific loggers to DEBUG for more detailed output
-logging.getLogger("app").setLevel(logging.DEBUG)
-logging.getLogger("app.api").setLevel(logging.DEBUG)
-logging.getLogger("app.graph").setLevel(logging.DEBUG)
-logging.getLogger("app.llm").setLevel(logging.DEBUG)
-logging.getLogger("app.rag").setLevel(logging.DEBUG)
-logging.getLogger("app.actions").setLevel(logging.DEBUG)
+# Set specific loggers to DEBUG for more detailed output (configurable, so production can turn it off)
+for logger_name in settings.debug_loggers:
+    logging.getLogger(logger_name).setLevel(logging.DEBUG)
 
 logger = logging.getLogger(__name__)
 
@@ -50,21 +51,24 @@ async def embed_policies():
             logger.warning(f"Policy directory not found: {policy_dir}")
             return
         
-        # Read all policy files
-        policies = []
-        for policy_file in policy_dir.glob("*.txt"):
-            logger.info(f"Reading policy file: {policy_file.name}...")
-            with open(policy_file, "r", encoding="utf-8") as f:
-                content = f.read()
-                
-                policies.append({
-                    "id": f"policy-{policy_file.stem}",
-                    "text": content,
-                    "metadata": {
-                        "filename": policy_file.name,
-                        "source": "order-policies",
-                    }
-                })
+        # Read all policy files in worker threads (startup runs other steps on the loop meanwhile)
+        policy_files = sorted(policy_dir.glob("*.txt"))
+        logger.info(f"Reading policy files: {[policy_file.name for policy_file in policy_files]}")
+        contents = await asyncio.gather(*(
+            asyncio.to_thread(policy_file.read_text, encoding="utf-8")
+            for policy_file in policy_files
+        ))
+        policies = [
+            {
+                "id": f"policy-{policy_file.stem}",
+                "text": content,
+                "metadata": {
+                    "filename": policy_file.name,
+                    "source": "order-policies",
+                }
+            }
+            for policy_file, content in zip(policy_files, contents)
+        ]
         
         if not policies:
             logger.warning("No policy files found!")
@@ -74,7 +78,11 @@ async def embed_policies():
         
         # Embed and upsert to ChromaDB
         logger.info("Embedding and uploading to ChromaDB...")
-        await client.upsert_policies_batch(policies)
+        if client.needs_rebuild:
+            # Index predates the tuned HNSW settings: rebuild it from these policies
+            await client.rebuild_collection(policies)
+        else:
+            await client.upsert_policies_batch(policies)
         logger.info(f"Successfully embedded {len(policies)} policies into ChromaDB!")
         logger.info(f"Collection: {client.collection_name}")
         logger.info(f"Storage location: {client.persist_directory}")
@@ -83,70 +91,67 @@ async def embed_policies():
         # Don't raise - allow app to start even if embedding fails
 
 
+# Mock orders seeded at startup (same as in mock_order_service.py), as
+# (delivery offset in days from today, OrderDB column values) pairs
+_SEED_ORDERS = (
+    (5, {
+        "order_id": "ORD-001",
+        "status": OrderStatus.PLACED,
+        "amount": 99.99,
+        "refundable": True,
+        "description": "Wireless Bluetooth headphones with noise cancellation",
+    }),
+    (2, {
+        "order_id": "ORD-002",
+        "status": OrderStatus.SHIPPED,
+        "amount": 149.50,
+        "refundable": True,
+        "description": "Smart fitness tracker with heart rate monitor",
+    }),
+    (-3, {
+        "order_id": "ORD-003",
+        "status": OrderStatus.DELIVERED,
+        "amount": 79.99,
+        "refundable": True,
+        "description": "Portable phone charger with fast charging support",
+    }),
+    (7, {
+        "order_id": "ORD-004",
+        "status": OrderStatus.CANCELLED,
+        "amount": 199.99,
+        "refundable": False,
+        "description": "Premium leather wallet with RFID blocking",
+    }),
+    (-10, {  # Delayed
+        "order_id": "ORD-005",
+        "status": OrderStatus.PLACED,
+        "amount": 299.99,
+        "refundable": True,
+        "description": "4K Ultra HD streaming device with voice remote",
+    }),
+)
+
+
 async def seed_orders():
     """Seed database with mock orders if they don't exist."""
     logger.info("Seeding orders into database...")
     
-    # Define mock orders (same as in mock_order_service.py)
+    # Plain rows rather than Order models: the values are fixed here, so they skip validation
+    today = date.today()
     mock_orders = [
-        Order(
-            order_id="ORD-001",
-            status=OrderStatus.PLACED,
-            expected_delivery_date=date.today() + timedelta(days=5),
-            amount=99.99,
-            refundable=True,
-            description="Wireless Bluetooth headphones with noise cancellation",
-        ),
-        Order(
-            order_id="ORD-002",
-            status=OrderStatus.SHIPPED,
-            expected_delivery_date=date.today() + timedelta(days=2),
-            amount=149.50,
-            refundable=True,
-            description="Smart fitness tracker with heart rate monitor",
-        ),
-        Order(
-            order_id="ORD-003",
-            status=OrderStatus.DELIVERED,
-            expected_delivery_date=date.today() - timedelta(days=3),
-            amount=79.99,
-            refundable=True,
-            description="Portable phone charger with fast charging support",
-        ),
-        Order(
-            order_id="ORD-004",
-            status=OrderStatus.CANCELLED,
-            expected_delivery_date=date.today() + timedelta(days=7),
-            amount=199.99,
-            refundable=False,
-            description="Premium leather wallet with RFID blocking",
-        ),
-        Order(
-            order_id="ORD-005",
-            status=OrderStatus.PLACED,
-            expected_delivery_date=date.today() - timedelta(days=10),  # Delayed
-            amount=299.99,
-            refundable=True,
-            description="4K Ultra HD streaming device with voice remote",
-        ),
+        {**row, "expected_delivery_date": today + timedelta(days=delivery_offset)}
+        for delivery_offset, row in _SEED_ORDERS
     ]
     
     async with AsyncSessionLocal() as session:
         try:
             repository = OrderRepository(session)
-            seeded_count = 0
             
-            for order in mock_orders:
-                exists = await repository.order_exists(order.order_id)
-                if not exists:
-                    await repository.create_order(order)
-                    seeded_count += 1
-                    logger.info(f"Seeded order: {order.order_id}")
-                else:
-                    logger.debug(f"Order {order.order_id} already exists, skipping")
+            # Single INSERT ... ON CONFLICT DO NOTHING; existing orders are left untouched
+            seeded_ids = await repository.insert_missing_orders(mock_orders)
             
-            if seeded_count > 0:
-                logger.info(f"Seeded {seeded_count} orders into database")
+            if seeded_ids:
+                logger.info(f"Seeded {len(seeded_ids)} orders into database: {seeded_ids}")
             else:
                 logger.info("All orders already exist in database, no seeding needed")
         except Exception as e:
@@ -154,83 +159,16 @@ async def seed_orders():
             # Don't raise - allow app to start even if seeding fails
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan events."""
-    # Startup
-    logger.info("=" * 80)
-    logger.info("APPLICATION STARTUP")
-    logger.info("=" * 80)
-    
-    # Setup observability
-    logger.info("Setting up observability...")
-    setup_observability()
-    logger.info("Observability configured")
+async def _clear_conversations():
+    """
+    Clear the conversations table (MemorySaver only).
     
-    # Initialize database
+    MemorySaver starts empty on each app restart, so conversations left in the
+    DB would have no history. With CHECKPOINTER_BACKEND=postgres, conversations
+    and checkpoints both persist in PostgreSQL and nothing is cleared.
+    """
     try:
-        logger.info("Initializing database...")
-        await init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.warning(f"Database initialization warning: {e}", exc_info=True)
-    
-    # ============================================================================
-    # TEMPORARY FIX: Clear conversations table on startup
-    # ============================================================================
-    # This ensures the conversations table is in sync with MemorySaver, which
-    # starts empty on each app restart. This prevents orphaned conversations
-    # (conversations in DB but no history in MemorySaver).
-    #
-    # MIGRATION TO POSTGRESSAVER - REMOVE THIS ENTIRE BLOCK:
-    # ----------------------------------------------------------------------------
-    # When migrating to PostgresSaver, you should:
-    #
-    # 1. REMOVE this entire block (lines below until "# End temporary fix")
-    #
-    # 2. UPDATE app/api/routes.py:
-    #    - Replace `from langgraph.checkpoint.memory import MemorySaver` 
-    #      with `from langgraph.checkpoint.postgres import PostgresSaver`
-    #    - Replace `_shared_checkpointer = MemorySaver()` 
-    #      with PostgresSaver initialization using your database connection
-    #    - Update checkpointer initialization to use PostgresSaver.from_conn_string()
-    #
-    # 3. UPDATE app/graph/graph.py:
-    #    - Remove `from langgraph.checkpoint.memory import MemorySaver`
-    #    - Update build_agent_graph() to require checkpointer parameter (no default)
-    #    - Remove the fallback to MemorySaver() if checkpointer is None
-    #
-    # 4. UPDATE requirements.txt:
-    #    - Add: psycopg2-binary>=2.9.0 (or psycopg[binary] for psycopg3)
-    #
-    # 5. UPDATE app/main.py (this file):
-    #    - Add PostgresSaver table initialization in startup:
-    #      ```python
-    #      from langgraph.checkpoint.postgres import PostgresSaver
-    #      from app.config import settings
-    #      
-    #      # Initialize PostgresSaver tables
-    #      db_url = settings.get_database_url
-    #      sync_db_url = db_url.replace("postgresql+asyncpg://", "postgresql://")
-    #      checkpointer = PostgresSaver.from_conn_string(sync_db_url)
-    #      await checkpointer.setup()  # Creates checkpoint tables
-    #      ```
-    #
-    # 6. UPDATE app/api/routes.py delete_conversation endpoint:
-    #    - Add logic to also delete checkpoints from PostgresSaver when deleting a conversation
-    #    - PostgresSaver may have methods to delete checkpoints by thread_id
-    #
-    # 7. REMOVE app/conversations/repository.py:
-    #    - Remove delete_all_conversations() method
-    #
-    # 8. REMOVE app/conversations/service.py:
-    #    - Remove delete_all_conversations() method
-    #
-    # After migration, conversations and checkpoints will both persist in PostgreSQL,
-    # so no need to clear on startup. Everything will survive app restarts.
-    # ============================================================================
-    try:
-        logger.info("Clearing conversations table (temporary fix for MemorySaver sync)...")
+        logger.info("Clearing conversations table (in-memory checkpointer is empty on restart)...")
         from app.conversations.service import ConversationService
         
         async with AsyncSessionLocal() as session:
@@ -238,28 +176,75 @@ async def lifespan(app: FastAPI):
             deleted_count = await conversation_service.delete_all_conversations()
             logger.info(f"Cleared {deleted_count} conversations from database")
             logger.warning("=" * 80)
-            logger.warning("TEMPORARY FIX ACTIVE: Conversations cleared on startup")
-            logger.warning("This ensures sync with MemorySaver (which is empty on restart)")
-            logger.warning("REMOVE THIS BLOCK when migrating to PostgresSaver")
+            logger.warning("Conversations cleared on startup to stay in sync with MemorySaver")
+            logger.warning("Set CHECKPOINTER_BACKEND=postgres to persist conversations across restarts")
             logger.warning("=" * 80)
     except Exception as e:
         logger.warning(f"Could not clear conversations on startup: {e}", exc_info=True)
         # Don't fail startup if this fails
-    # End temporary fix
-    # ============================================================================
-    
-    # Embed policies
+
+
+async def _seed_orders_safely():
+    """Seed orders, logging instead of failing startup."""
     try:
-        await embed_policies()
+        await seed_orders()
     except Exception as e:
-        logger.warning(f"Policy embedding warning: {e}", exc_info=True)
-        # Don't fail startup if embedding fails
+        logger.warning(f"Order seeding warning: {e}", exc_info=True)
+
+
+async def _init_database():
+    """Create tables, then clear stale conversations and seed orders concurrently."""
+    try:
+        logger.info("Initializing database...")
+        await init_db()
+        logger.info("Database initialized successfully")
+    except Exception as e:
+        logger.warning(f"Database initialization warning: {e}", exc_info=True)
     
-    # Seed orders
+    # Both only need the tables and touch different ones
+    if is_persistent_checkpointer():
+        await _seed_orders_safely()
+    else:
+        await asyncio.gather(_clear_conversations(), _seed_orders_safely())
+
+
+async def _prepare_policies():
+    """Embed policies, then load the vector index the agent queries."""
+    await embed_policies()
+    await policy_chroma_client.warm_up()
+
+
+async def _init_checkpointer():
+    """Initialize the LangGraph checkpointer (backend from CHECKPOINTER_BACKEND)."""
     try:
-        await seed_orders()
+        logger.info(f"Initializing checkpointer (backend: {settings.checkpointer_backend})...")
+        await init_checkpointer()
+        logger.info("Checkpointer initialized successfully")
     except Exception as e:
-        logger.warning(f"Order seeding warning: {e}", exc_info=True)
+        logger.warning(f"Checkpointer initialization warning: {e}", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan events."""
+    # Startup
+    logger.info("=" * 80)
+    logger.info("APPLICATION STARTUP")
+    logger.info("=" * 80)
+    
+    # Setup observability
+    logger.info("Setting up observability...")
+    setup_observability()
+    logger.info("Observability configured")
+    
+    # Independent startup steps run concurrently: the database (then seeding), the
+    # checkpointer pool and policy embedding each wait on their own I/O.
+    # Every step handles its own errors so one failure doesn't cancel the others.
+    await asyncio.gather(
+        _init_database(),
+        _init_checkpointer(),
+        _prepare_policies(),
+    )
     
     logger.info("Application startup complete")
     logger.info("=" * 80)
@@ -270,6 +255,9 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 80)
     logger.info("APPLICATION SHUTDOWN")
     logger.info("=" * 80)
+    await close_checkpointer()
+    await close_http_client()
+    await approval_store.aclose()
 
 
 # Create FastAPI app
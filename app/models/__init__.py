@@ -8,6 +8,7 @@ from app.models.domain import (
     ApprovalStatus,
     LLMResponse,
     NextStep,
+    Intent,
     Conversation,
 )
 from app.models.database import (
@@ -29,6 +30,7 @@ __all__ = [
     "ApprovalStatus",
     "LLMResponse",
     "NextStep",
+    "Intent",
     "Conversation",
     "Base",
     "ApprovalDB",
@@ -1,5 +1,6 @@
 """SQLAlchemy database models."""
 from datetime import datetime, date
+from typing import AsyncIterator
 from sqlalchemy import String, DateTime, Enum as SQLEnum, Text, Date, Float, Boolean
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
@@ -93,12 +94,25 @@ class OrderDB(Base):
 # Get SSL configuration for asyncpg (handles sslmode parameter conversion)
 connect_args = settings.get_ssl_config()
 
+if settings.db_pool_size > 0:
+    # Direct PostgreSQL connection: keep warm connections in process.
+    # LIFO reuses the most recently returned connection, so idle extras time out and close.
+    pool_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_use_lifo": True,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+else:
+    pool_args = {"poolclass": NullPool}  # Very important for PgBouncer - let PgBouncer handle pooling
+
 engine = create_async_engine(
     settings.get_database_url,
-    poolclass=NullPool,  # Very important for PgBouncer - let PgBouncer handle pooling
     echo=False,
     future=True,
     connect_args=connect_args,
+    **pool_args,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -110,13 +124,10 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
-async def get_db() -> AsyncSession:
-    """Dependency for getting database session."""
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for getting database session (closed when the context manager exits)."""
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
 
 async def init_db():
@@ -35,6 +35,15 @@ class NextStep(str, Enum):
     FETCH_POLICY = "FETCH_POLICY"
 
 
+class Intent(str, Enum):
+    """User intent enumeration (keyword-classified in classify_intent)."""
+    REFUND = "REFUND"
+    CANCELLATION = "CANCELLATION"
+    DELAYED_ORDER = "DELAYED_ORDER"
+    POLICY_QUESTION = "POLICY_QUESTION"
+    GENERAL = "GENERAL"
+
+
 class Order(BaseModel):
     """Order domain model."""
     order_id: str = Field(..., description="Unique order identifier")
@@ -44,13 +53,8 @@ class Order(BaseModel):
     refundable: bool = Field(..., description="Whether order is refundable")
     description: Optional[str] = Field(None, description="Order description")
     
-    model_config = {
-        "extra": "forbid",
-        "strict": True,
-        "json_encoders": {
-            date: lambda v: v.isoformat() if v else None
-        }
-    }
+    # JSON dumps already write expected_delivery_date as an ISO date
+    model_config = {"extra": "forbid", "strict": True}
 
 
 class AgentDecision(BaseModel):
@@ -10,6 +10,10 @@ class Observability:
     
     def __init__(self):
         """Initialize LangSmith client."""
+        # LangSmith clients sample whole traces (root run and children) at this rate.
+        # Exported before any Client exists: langsmith caches env lookups on first read.
+        if settings.langchain_tracing_sampling_rate is not None:
+            os.environ["LANGCHAIN_TRACING_SAMPLING_RATE"] = str(settings.langchain_tracing_sampling_rate)
         if settings.langchain_tracing_v2 and settings.langchain_api_key:
             self.client = Client(api_key=settings.langchain_api_key)
             self.enabled = True
@@ -1,6 +1,10 @@
 """ChromaDB RAG client for policy retrieval."""
+import asyncio
+import contextvars
 import logging
-from typing import List, Dict, Any, Optional
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
 import chromadb
 from langsmith import traceable
 from app.config import settings
@@ -8,6 +12,19 @@ from app.rag.embedder import Embedder
 
 logger = logging.getLogger(__name__)
 
+# Micro-batching of concurrent policy queries: send at most MAX_BATCH queries per batch.
+# How long to wait for more queries is settings.policy_query_batch_window_ms.
+MAX_BATCH = 16
+
+# HNSW index settings for the policy collection. Cosine space makes 1 - distance a
+# cosine similarity for OpenAI embeddings. These are fixed when the collection is created.
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
 
 class ChromaClient:
     """ChromaDB client for vector storage and retrieval."""
@@ -25,6 +42,9 @@ class ChromaClient:
         # Get or create collection
         # Note: ChromaDB will handle embeddings, but we're using our own embedder
         # So we'll store pre-computed embeddings
+        # (get first: get_or_create_collection on an existing collection only rewrites the
+        # metadata; an index built with the old HNSW settings is kept as is here and
+        # rebuilt at startup by embed_policies, see rebuild_collection)
         try:
             self.collection = self.client.get_collection(
                 name=self.collection_name,
@@ -32,12 +52,97 @@ class ChromaClient:
             )
             print(f"Loaded existing ChromaDB collection: {self.collection_name}")
         except Exception:
-            # Collection doesn't exist, create it
-            self.collection = self.client.create_collection(
+            # Collection doesn't exist, create it (get_or_create: another worker may be creating it too)
+            self.collection = self.client.get_or_create_collection(
                 name=self.collection_name,
+                metadata=HNSW_METADATA,
                 embedding_function=None  # We provide our own embeddings
             )
             print(f"Created new ChromaDB collection: {self.collection_name}")
+        
+        # Query micro-batcher state, created lazily on the running event loop
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_worker: Optional[asyncio.Task] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def warm_up(self) -> None:
+        """
+        Run one throwaway query so the HNSW index is loaded before the first user request.
+        
+        PersistentClient loads the vector segment lazily on first query, which would
+        otherwise land on whichever chat request hits retrieve_policy first.
+        """
+        try:
+            # Startup may have just rebuilt the collection under this name
+            self.refresh_collection()
+            if self.collection.count() == 0:
+                logger.info("RAG: Skipping ChromaDB warm-up (collection is empty)")
+                return
+            start = time.perf_counter()
+            # Any vector of the right dimension works; only the index load matters
+            probe = [1.0] + [0.0] * (self.embedder.dimension - 1)
+            await asyncio.to_thread(self.collection.query, query_embeddings=[probe], n_results=1, include=[])
+            logger.info(f"RAG: ChromaDB warm-up query took {(time.perf_counter() - start) * 1000:.1f} ms")
+        except Exception as e:
+            logger.warning(f"RAG: ChromaDB warm-up failed: {e}")
+    
+    def _create_collection(self, name: str):
+        """Create a collection with the tuned HNSW index settings."""
+        return self.client.create_collection(
+            name=name,
+            metadata=HNSW_METADATA,
+            embedding_function=None  # We provide our own embeddings
+        )
+    
+    @property
+    def needs_rebuild(self) -> bool:
+        """Whether the collection's index predates the tuned HNSW settings."""
+        return (self.collection.metadata or {}).get("hnsw:space") != HNSW_METADATA["hnsw:space"]
+    
+    def refresh_collection(self) -> bool:
+        """
+        Re-fetch the collection by name, e.g. after another client rebuilt it.
+        
+        Returns:
+            True if the name now points at a different collection
+        """
+        collection = self.client.get_collection(name=self.collection_name, embedding_function=None)
+        changed = collection.id != self.collection.id
+        self.collection = collection
+        return changed
+    
+    async def rebuild_collection(self, policies: List[Dict[str, str]]) -> None:
+        """
+        Rebuild the collection with the tuned HNSW settings and the given policies.
+        
+        The policies are written to a new collection first; the old one is only
+        dropped once that succeeded, so a failed rebuild leaves it untouched.
+        
+        Args:
+            policies: List of dictionaries with 'id', 'text', and optional 'metadata'
+        """
+        staging_name = f"{self.collection_name}-rebuild-{uuid.uuid4().hex[:8]}"
+        logger.info(f"RAG: Rebuilding ChromaDB collection {self.collection_name} with tuned HNSW settings")
+        staging = await asyncio.to_thread(self._create_collection, staging_name)
+        try:
+            await self._upsert_policies(staging, policies)
+        except Exception:
+            await asyncio.to_thread(self.client.delete_collection, name=staging_name)
+            raise
+        
+        try:
+            await asyncio.to_thread(self.client.delete_collection, name=self.collection_name)
+        except Exception as e:
+            # Another worker may have dropped it already
+            logger.info(f"RAG: Old ChromaDB collection already gone: {e}")
+        try:
+            await asyncio.to_thread(staging.modify, name=self.collection_name)
+            self.collection = staging
+        except Exception as e:
+            # Another worker finished its rebuild first; use that one
+            logger.info(f"RAG: ChromaDB collection rebuilt concurrently, keeping existing one: {e}")
+            await asyncio.to_thread(self.client.delete_collection, name=staging_name)
+            self.refresh_collection()
     
     @traceable(name="chroma_upsert")
     async def upsert_policy(
@@ -90,37 +195,13 @@ class ChromaClient:
         """
         logger.info(f"RAG: query_policies - START - query: '{query_text[:100]}...', top_k: {top_k}")
         try:
-            # Generate query embedding
-            logger.info("RAG: Generating query embedding...")
-            query_embedding = await self.embedder.embed_text(query_text)
-            logger.info(f"RAG: Embedding generated, length: {len(query_embedding)}")
+            # Concurrent queries are embedded and searched together by the batch worker
+            future = asyncio.get_running_loop().create_future()
+            self._get_batch_queue().put_nowait((query_text, top_k, future))
+            policy_chunks = await future
             
-            # Query ChromaDB
-            logger.info(f"RAG: Querying ChromaDB collection '{self.collection_name}'...")
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k,
-                include=["documents", "metadatas", "distances"]
-            )
-            logger.info(f"RAG: ChromaDB query completed")
-            
-            # Format results
-            policy_chunks = []
-            if results["ids"] and len(results["ids"][0]) > 0:
-                logger.info(f"RAG: Found {len(results['ids'][0])} results")
-                for i in range(len(results["ids"][0])):
-                    score = 1 - results["distances"][0][i]  # Convert distance to similarity
-                    text = results["documents"][0][i]
-                    policy_chunks.append({
-                        "id": results["ids"][0][i],
-                        "score": score,
-                        "text": text,
-                        "metadata": results["metadatas"][0][i] if results["metadatas"] else {}
-                    })
-                    logger.debug(f"RAG: Result {i+1} - id: {results['ids'][0][i]}, score: {score:.3f}, text_length: {len(text)}")
-            else:
+            if not policy_chunks:
                 logger.warning("RAG: No results found in ChromaDB")
-            
             logger.info(f"RAG: query_policies - END - returning {len(policy_chunks)} chunks")
             return policy_chunks
             
@@ -128,6 +209,104 @@ class ChromaClient:
             logger.error(f"RAG: Error querying policies: {str(e)}", exc_info=True)
             raise RuntimeError(f"Failed to query policies: {e}")
     
+    def _get_batch_queue(self) -> asyncio.Queue:
+        """Get the query queue, (re)starting the batch worker on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._batch_loop is not loop or self._batch_worker is None or self._batch_worker.done():
+            self._batch_queue = asyncio.Queue()
+            self._batch_loop = loop
+            # Empty context: the worker outlives the request that started it, and batch
+            # spans must not be nested under that request's trace
+            self._batch_worker = loop.create_task(self._run_batch_worker(), context=contextvars.Context())
+        return self._batch_queue
+    
+    async def _run_batch_worker(self) -> None:
+        """Collect queued queries into batches and resolve each caller's future."""
+        queue = self._batch_queue
+        while True:
+            batch = [await queue.get()]
+            # Take queries that queued up while the previous batch ran; a lone query goes out at once
+            while len(batch) < MAX_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+            # Optionally wait a little longer for concurrent queries to join this batch
+            window_ms = settings.policy_query_batch_window_ms
+            if window_ms > 0:
+                deadline = asyncio.get_running_loop().time() + window_ms / 1000
+                while len(batch) < MAX_BATCH:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            
+            try:
+                results = await self._query_batch([(query_text, top_k) for query_text, top_k, _ in batch])
+                for (_, _, future), policy_chunks in zip(batch, results):
+                    if not future.done():
+                        future.set_result(policy_chunks)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def _query_batch(self, queries: List[Tuple[str, int]]) -> List[List[Dict[str, Any]]]:
+        """
+        Embed and search a batch of queries with one embedding call and one ChromaDB query.
+        
+        Args:
+            queries: List of (query_text, top_k) tuples
+            
+        Returns:
+            Policy chunks for each query, in the same order
+        """
+        # Generate query embeddings in one call
+        logger.info(f"RAG: Generating embeddings for {len(queries)} queries...")
+        query_embeddings = await self.embedder.embed_batch([query_text for query_text, _ in queries])
+        
+        # Query ChromaDB once, with enough results for the largest top_k
+        max_top_k = max(top_k for _, top_k in queries)
+        logger.info(f"RAG: Querying ChromaDB collection '{self.collection_name}' ({len(queries)} queries)...")
+        # The local (persistent) client searches synchronously, so run it off the event loop
+        try:
+            results = await asyncio.to_thread(
+                self.collection.query,
+                query_embeddings=query_embeddings,
+                n_results=max_top_k,
+                include=["documents", "metadatas", "distances"],
+            )
+        except Exception:
+            # Retry once if the collection was rebuilt (by another worker) since it was loaded
+            if not await asyncio.to_thread(self.refresh_collection):
+                raise
+            logger.info(f"RAG: ChromaDB collection '{self.collection_name}' was rebuilt, retrying query")
+            results = await asyncio.to_thread(
+                self.collection.query,
+                query_embeddings=query_embeddings,
+                n_results=max_top_k,
+                include=["documents", "metadatas", "distances"],
+            )
+        logger.info(f"RAG: ChromaDB query completed")
+        
+        # Format results, trimmed to each caller's top_k
+        batch_chunks = []
+        for q, (_, top_k) in enumerate(queries):
+            policy_chunks = []
+            ids = results["ids"][q] if results["ids"] else []
+            for i in range(min(top_k, len(ids))):
+                score = 1 - results["distances"][q][i]  # Convert distance to similarity
+                text = results["documents"][q][i]
+                policy_chunks.append({
+                    "id": ids[i],
+                    "score": score,
+                    "text": text,
+                    "metadata": results["metadatas"][q][i] if results["metadatas"] else {}
+                })
+                logger.debug("RAG: Result %d - id: %s, score: %.3f, text_length: %d", i + 1, ids[i], score, len(text))
+            batch_chunks.append(policy_chunks)
+        return batch_chunks
+    
     @traceable(name="chroma_batch_upsert")
     async def upsert_policies_batch(
         self,
@@ -139,6 +318,10 @@ class ChromaClient:
         Args:
             policies: List of dictionaries with 'id', 'text', and optional 'metadata'
         """
+        await self._upsert_policies(self.collection, policies)
+    
+    async def _upsert_policies(self, collection, policies: List[Dict[str, str]]) -> None:
+        """Embed policies and upsert them into the given collection."""
         try:
             # Generate embeddings for all policies
             texts = [policy["text"] for policy in policies]
@@ -154,8 +337,9 @@ class ChromaClient:
                 metadata["text"] = policy["text"]
                 metadatas.append(metadata)
             
-            # Batch upsert
-            self.collection.upsert(
+            # Batch upsert (off the event loop, like queries: the local client writes synchronously)
+            await asyncio.to_thread(
+                collection.upsert,
                 ids=ids,
                 embeddings=embeddings,
                 documents=documents,
@@ -7,6 +7,7 @@ from typing import List
 from openai import AsyncOpenAI
 from langsmith import traceable
 from app.config import settings
+from app.llm.http_client import get_http_client
 
 
 class Embedder:
@@ -18,7 +19,12 @@ class Embedder:
     
     def __init__(self):
         """Initialize OpenAI embeddings client."""
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Shared connection pool (keep-alive, HTTP/2 when available) instead of one per client
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=get_http_client(),
+            max_retries=settings.llm_max_retries,
+        )
         self.model = "text-embedding-3-small"  # 1536 dimensions
         self.dimension = 1536
     
@@ -0,0 +1,50 @@
+"""In-process LRU + TTL cache for policy retrieval results.
+
+Support chats repeat the same questions ("where is my order", "refund status"),
+so identical queries can skip both the embedding call and the ChromaDB search.
+"""
+import hashlib
+import re
+from typing import Any, Dict, List, Tuple
+
+from app.cache import LRUTTLCache
+
+# Order references ("ORD-001", "#5") don't change which policies match
+_ORDER_ID_TOKEN_RE = re.compile(r"\bord-[a-z0-9]+\b|#\d+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a policy query for cache lookup.
+
+    Lowercases, drops order-id tokens and collapses whitespace.
+
+    Args:
+        query: Policy query text
+
+    Returns:
+        Normalized query
+    """
+    query = _ORDER_ID_TOKEN_RE.sub(" ", query.lower())
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def policy_query_key(lookup: Tuple[str, int]) -> str:
+    """Cache key for a (query, top_k) lookup: hash of the normalized query and top_k."""
+    query, top_k = lookup
+    return hashlib.sha256(f"{normalize_query(query)}|{top_k}".encode()).hexdigest()
+
+
+class PolicyQueryCache(LRUTTLCache[List[Dict[str, Any]]]):
+    """LRU cache of policy chunks keyed on the normalized query and top_k, with per-entry TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+            ttl_seconds: Seconds before a cached result expires
+        """
+        super().__init__(max_size=max_size, ttl_seconds=ttl_seconds, key=policy_query_key)